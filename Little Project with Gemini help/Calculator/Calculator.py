@@ -3,61 +3,161 @@ This program is a simple command-line calculator.
 Current features:
 - Supported operations: Square root (sqrt), addition (+), subtraction (-), multiplication (*), division (/).
 - Input validation: Checks to ensure valid integer numbers are entered for two-number operations.
+- Expressions: "expr" in the menu, or an expression on the command line, e.g. "sqrt(x) * (2 + 3.5)"
+  (see expression.py: parentheses, floats, variables).
+- Streaming: one expression per line from a file or stdin, one result per line.
+- Columns: one operation over whole columns of CSV or binary files, with NumPy
+  (see columns.py: chunked, memory-mapped when larger than RAM).
+
+Examples:
+    python Calculator.py
+    python Calculator.py "sqrt(16) + x / 2" --var x=3
+    python Calculator.py --stream expressions.txt --output results.txt
+    type expressions.txt | python Calculator.py --stream
+    python Calculator.py --columns / sales.csv:revenue sales.csv:units --output per_unit.csv
 """
 
-print("Choose the operation you want to perform: ")
-print("sqrt")
-print("+")
-print("-")
-print("*")
-print("/")
-
-operation = input("Enter the operation you want to perform: ")
-
-if operation == "sqrt":
-    # Function to request a valid integer
-    def get_int_input(prompt):
-        while True:
-            try:
-                # Try to convert input to integer
-                value = int(input(prompt))
-                return value
-            except ValueError:
-                # If it fails, print an error and ask again
-                print("Error: Please enter a valid integer.")
-    a = get_int_input("Number: ")
-    root = a ** (1/2)
-    print(root)
-       
-else:
-    # Function to request a valid integer
-    def get_int_input(prompt):
-        while True:
-            try:
-                # Try to convert input to integer
-                value = int(input(prompt))
-                return value
-            except ValueError:
-                # If it fails, print an error and ask again
-                print("Error: Please enter a valid integer.")
-
-    # Use the function to get a and b
-    a = get_int_input("Number 1: ")
-    b = get_int_input("Number 2: ")
-    if operation == "+":
-        result = a + b
-        print(result)
-    elif operation == "-":
-        result = a - b
-        print(result)
-    elif operation == "*":
-        result = a * b
-        print(result)
-    elif operation == "/":
-        if b != 0:
-            result = a / b
-            print(result)
-        else:
+import argparse
+import sys
+import time
+
+from expression import ERRORS, evaluate_line, evaluate_stream
+
+
+# Function to request a valid integer
+def get_int_input(prompt):
+    while True:
+        try:
+            # Try to convert input to integer
+            value = int(input(prompt))
+            return value
+        except ValueError:
+            # If it fails, print an error and ask again
+            print("Error: Please enter a valid integer.")
+
+
+def menu():
+    print("Choose the operation you want to perform: ")
+    print("sqrt")
+    print("+")
+    print("-")
+    print("*")
+    print("/")
+    print("expr (a whole expression)")
+
+    operation = input("Enter the operation you want to perform: ")
+
+    if operation == "sqrt":
+        a = get_int_input("Number: ")
+        root = a ** (1/2)
+        print(root)
+
+    elif operation == "expr":
+        try:
+            print(evaluate_line(input("Expression: "), {}))
+        except ZeroDivisionError:
             print("Error")
+        except ERRORS as e:
+            print(f"Error: {e}")
+
+    else:
+        # Use the function to get a and b
+        a = get_int_input("Number 1: ")
+        b = get_int_input("Number 2: ")
+        if operation == "+":
+            result = a + b
+            print(result)
+        elif operation == "-":
+            result = a - b
+            print(result)
+        elif operation == "*":
+            result = a * b
+            print(result)
+        elif operation == "/":
+            if b != 0:
+                result = a / b
+                print(result)
+            else:
+                print("Error")
+
+    print("Success!")
+
+
+def parse_variables(assignments):
+    variables = {}
+    for item in assignments:
+        try:
+            evaluate_line(item, variables)  # "x=3", or "y=x*2" using the ones before
+        except ERRORS as e:
+            raise SystemExit(f"--var {item}: {e}")
+    return variables
+
+
+def run_columns(args):
+    if len(args.columns) not in (2, 3):
+        raise SystemExit("--columns takes OPERATION A [B].")
+    if not args.output:
+        raise SystemExit("--columns needs --output (.csv/.txt for text, anything else for raw float64).")
+    try:
+        import columns  # NumPy is only needed here
+    except ImportError:
+        raise SystemExit("The columnar mode needs NumPy: pip install numpy")
+    op, a, b = (args.columns + [None])[:3]
+    try:
+        stats = columns.run(op, a, b, args.output, args.chunk_rows or columns.CHUNK_ROWS)
+    except (OSError, ValueError) as e:
+        raise SystemExit(f"Error: {e}")
+    print(f"{stats['rows']} rows in {stats['seconds']}s, {stats['errors']} errors -> {args.output}", file=sys.stderr)
+    return 0 if stats["errors"] == 0 else 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Command-line calculator.")
+    parser.add_argument("expression", nargs="?", help="Expression to evaluate (no menu)")
+    parser.add_argument("--stream", nargs="?", const="-", metavar="FILE",
+                        help="Evaluate one expression per line from FILE (default: stdin)")
+    parser.add_argument("--output", default=None, metavar="FILE", help="Where results go (--stream: default stdout)")
+    parser.add_argument("--var", action="append", default=[], metavar="NAME=VALUE", help="Set a variable (repeatable)")
+    parser.add_argument("--columns", nargs="+", metavar="ARG",
+                        help="OPERATION A [B]: apply +, -, *, / or sqrt to columns, each FILE[:COLUMN] or a number")
+    parser.add_argument("--chunk-rows", type=int, default=None, help="Rows per chunk in --columns mode")
+    args = parser.parse_args(argv)
+
+    if args.columns:
+        return run_columns(args)
+
+    if args.expression is None and args.stream is None:
+        menu()
+        return 0
+
+    variables = parse_variables(args.var)
+    if args.expression is not None:
+        try:
+            print(evaluate_line(args.expression, variables))
+        except ZeroDivisionError:
+            print("Error: division by zero")
+            return 1
+        except ERRORS as e:
+            print(f"Error: {e}")
+            return 1
+        return 0
+
+    source = sys.stdin if args.stream == "-" else open(args.stream, encoding="utf-8")
+    out = sys.stdout if args.output is None else open(args.output, "w", encoding="utf-8")
+    start = time.perf_counter()
+    try:
+        count, errors = evaluate_stream(source, out, variables)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if out is not sys.stdout:
+            out.close()
+    elapsed = time.perf_counter() - start
+    # On stderr, so it does not mix with the results
+    print(f"{count} expressions in {elapsed:.3f}s ({count / elapsed if elapsed else 0:,.0f}/s), {errors} errors",
+          file=sys.stderr)
+    return 0 if errors == 0 else 1
+
 
-print("Success!")
\ No newline at end of file
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+"""
+Columnar mode against the scalar loop.
+For every operation, times the calculator's own logic applied one pair of
+numbers at a time (including its `if b != 0 ... else "Error"` check) and
+columns.apply over chunks of the same data. Then times a whole CSV file
+to CSV file run both ways (reading, computing, writing).
+
+    python benchmarks/bench_columns.py --rows 1000000
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+import columns  # noqa: E402
+
+SCALAR = {
+    "+": lambda a, b: a + b,
+    "-": lambda a, b: a - b,
+    "*": lambda a, b: a * b,
+    "/": lambda a, b: a / b if b != 0 else "Error",
+    "sqrt": lambda a, b: a ** (1/2) if a >= 0 else "Error",
+}
+
+
+def scalar_loop(op, a, b):
+    fn = SCALAR[op]
+    return [fn(x, y) for x, y in zip(a, b)]
+
+
+def vectorized(op, a, b, chunk_rows):
+    for start in range(0, len(a), chunk_rows):
+        columns.apply(op, a[start:start + chunk_rows], None if op == "sqrt" else b[start:start + chunk_rows])
+
+
+def scalar_files(op, in_path, out_path):
+    # What a per-row Python loop over the same files does
+    with open(in_path, encoding="utf-8") as f, open(out_path, "w", encoding="utf-8") as out:
+        reader = csv.reader(f)
+        next(reader)
+        fn = SCALAR[op]
+        for row in reader:
+            out.write(f"{fn(float(row[0]), float(row[1]))}\n")
+
+
+def best(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Columnar mode vs the scalar loop.")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Rows per column")
+    parser.add_argument("--chunk-rows", type=int, default=columns.CHUNK_ROWS, help="Rows per chunk")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement (the best one counts)")
+    parser.add_argument("--json", default=None, metavar="PATH", help="Also write the results to PATH")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    a = rng.uniform(-100, 100, args.rows)
+    b = rng.integers(-5, 5, args.rows).astype(np.float64)  # One row in ten divides by zero
+    a_list, b_list = a.tolist(), b.tolist()
+
+    results = {}
+    print(f"{args.rows:,} rows, chunks of {args.chunk_rows:,}")
+    for op in columns.OPERATIONS:
+        scalar = best(lambda: scalar_loop(op, a_list, b_list), args.repeat)
+        vector = best(lambda: vectorized(op, a, b, args.chunk_rows), args.repeat)
+        results[op] = {"scalar_s": round(scalar, 4), "columns_s": round(vector, 4), "speedup": round(scalar / vector, 1)}
+        print(f"  {op:<5} scalar {scalar * 1000:9.1f} ms   columns {vector * 1000:8.1f} ms   x{scalar / vector:.1f}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        in_path = os.path.join(tmp, "in.csv")
+        with open(in_path, "w", encoding="utf-8") as f:
+            f.write("a,b\n")
+            f.writelines(f"{x},{y}\n" for x, y in zip(a_list, b_list))
+        scalar = best(lambda: scalar_files("/", in_path, os.path.join(tmp, "scalar.csv")), 1)
+        vector = best(lambda: columns.run("/", in_path + ":a", in_path + ":b", os.path.join(tmp, "columns.csv"),
+                                          args.chunk_rows), 1)
+        results["csv / csv"] = {"scalar_s": round(scalar, 4), "columns_s": round(vector, 4),
+                                "speedup": round(scalar / vector, 1)}
+        print(f"  CSV to CSV, /: scalar {scalar * 1000:.1f} ms   columns {vector * 1000:.1f} ms   x{scalar / vector:.1f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"created": time.strftime("%Y-%m-%d %H:%M:%S"), "rows": args.rows, "results": results},
+                      f, indent=4)
+        print(f"\nResults written to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
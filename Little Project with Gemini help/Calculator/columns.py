@@ -0,0 +1,200 @@
+"""
+Columnar mode for the calculator: applies one operation (+ - * / sqrt)
+element by element to whole numeric columns, with NumPy.
+- Operands are FILE[:COLUMN] or a plain number, used for every row
+  - CSV/text files: COLUMN is a header name or a 0-based index (default: the
+    first column); rows are read CHUNK_ROWS at a time
+  - .npy files, and other binary files holding raw float64 values: loaded
+    whole when they fit comfortably in free memory, memory-mapped otherwise,
+    so columns larger than RAM work too
+- Division by zero and sqrt of a negative number only fail their own rows:
+  they are masked out and written as "Error" (text output) or NaN (binary)
+- Results are written chunk by chunk: to a CSV/text file, one per line, or
+  as raw float64 to any other file
+"""
+
+import itertools
+import os
+import time
+
+import numpy as np
+
+CHUNK_ROWS = 1_000_000
+MEMMAP_FRACTION = 0.5  # Binary columns bigger than this share of free RAM are memory-mapped
+TEXT_EXTENSIONS = (".csv", ".tsv", ".txt")
+OPERATIONS = ("+", "-", "*", "/", "sqrt")
+
+
+def is_text(path):
+    return path.lower().endswith(TEXT_EXTENSIONS)
+
+
+def free_memory():
+    """Bytes of free RAM, or None where the OS does not say (Windows)."""
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+# --- INPUT ---
+def parse_operand(spec):
+    """A number, or (path, column) with column None for the default."""
+    try:
+        return float(spec)
+    except ValueError:
+        pass
+    if os.path.exists(spec):
+        return spec, None
+    path, sep, column = spec.rpartition(":")  # rpartition: C:\data.csv:price
+    if sep and os.path.exists(path):
+        return path, column
+    raise ValueError(f"No such file or number: {spec}")
+
+
+def open_binary(path, column=None):
+    """The column of a binary file, as an array or a read-only memmap."""
+    free = free_memory()
+    fits = free is not None and os.path.getsize(path) < free * MEMMAP_FRACTION
+    if path.lower().endswith(".npy"):
+        array = np.load(path, mmap_mode=None if fits else "r")
+    elif fits:
+        array = np.fromfile(path, dtype=np.float64)
+    else:
+        array = np.memmap(path, dtype=np.float64, mode="r")
+    if array.ndim == 2:
+        array = array[:, int(column or 0)]
+    elif array.ndim != 1 or column not in (None, "", "0"):
+        raise ValueError(f"{path}: no column {column}")
+    return array
+
+
+def _split(line, delimiter):
+    return [f.strip().strip('"') for f in (line.split(delimiter) if delimiter else line.split())]
+
+
+def _column_index(path, column, fields, header):
+    if column in (None, ""):
+        index = 0
+    elif header and column in fields:
+        index = fields.index(column)
+    elif column.isdigit():
+        index = int(column)
+    else:
+        raise ValueError(f"{path}: no column {column}")
+    if index >= len(fields):
+        raise ValueError(f"{path}: no column {column}")
+    return index
+
+
+def read_text(path, columns=(None,), chunk_rows=CHUNK_ROWS):
+    """Yields the given columns of a CSV/text file, as a tuple of float64
+    arrays of chunk_rows rows; the file is read once for all of them."""
+    with open(path, encoding="utf-8") as f:
+        first = f.readline()
+        delimiter = next((d for d in (",", ";", "\t") if d in first), None)  # None: whitespace
+        fields = _split(first, delimiter)
+        try:
+            [float(x) for x in fields]
+            lines = [first]  # No header: the first line is data
+        except ValueError:
+            lines = []
+        indexes = [_column_index(path, column, fields, not lines) for column in columns]
+
+        while True:
+            lines += itertools.islice(f, chunk_rows - len(lines))
+            if not lines:
+                return
+            table = np.loadtxt(lines, delimiter=delimiter, usecols=indexes, dtype=np.float64, ndmin=2)
+            yield tuple(table[:, i] for i in range(len(indexes)))
+            lines = []
+
+
+def read_column(path, column=None, chunk_rows=CHUNK_ROWS):
+    """Yields a column of any supported file in float64 chunks of chunk_rows rows."""
+    if is_text(path):
+        for (chunk,) in read_text(path, [column], chunk_rows):
+            yield chunk
+        return
+    array = open_binary(path, column)
+    for start in range(0, len(array), chunk_rows):
+        # Only this slice is read from a memmap
+        yield np.asarray(array[start:start + chunk_rows], dtype=np.float64)
+
+
+# --- OPERATIONS ---
+def apply(op, a, b=None):
+    """(result, errors) of op on one chunk (b may be a number). errors is the
+    mask of the rows without a result (division by zero, sqrt of a negative
+    number), or None when every row has one."""
+    if op == "+":
+        return np.add(a, b), None
+    if op == "-":
+        return np.subtract(a, b), None
+    if op == "*":
+        return np.multiply(a, b), None
+    if op == "/":
+        a, b = np.broadcast_arrays(a, b)
+        errors = b == 0
+        result = np.full(a.shape, np.nan)
+        np.divide(a, b, out=result, where=~errors)
+    elif op == "sqrt":
+        errors = a < 0
+        result = np.full(a.shape, np.nan)
+        np.sqrt(a, out=result, where=~errors)
+    else:
+        raise ValueError(f"Unknown operation: {op}")
+    return result, (errors if errors.any() else None)
+
+
+# --- OUTPUT ---
+def write_chunk(out, text, result, errors):
+    if not text:
+        result.tofile(out)  # NaN in the rows with errors
+        return
+    values = result.tolist()
+    if errors is not None:
+        for i in np.flatnonzero(errors):
+            values[i] = "Error"
+    out.write("\n".join(map(str, values)) + "\n")
+
+
+def run(op, a_spec, b_spec, out_path, chunk_rows=CHUNK_ROWS):
+    """Applies op to the operands (see parse_operand), writing to out_path.
+    Returns {"rows", "errors", "seconds"}."""
+    if op not in OPERATIONS:
+        raise ValueError(f"Unknown operation: {op}")
+    if (op == "sqrt") != (b_spec is None):
+        raise ValueError("sqrt takes one operand, the other operations two.")
+    a = parse_operand(a_spec)
+    b = None if b_spec is None else parse_operand(b_spec)
+    if isinstance(a, float) and (b is None or isinstance(b, float)):
+        raise ValueError("At least one operand must be a file.")
+
+    def chunks(operand):
+        if operand is None or isinstance(operand, float):
+            return itertools.repeat(operand)  # Never ends: the file operand decides the length
+        return read_column(operand[0], operand[1], chunk_rows)
+
+    both_files = not isinstance(a, float) and isinstance(b, tuple)
+    end = object()
+    if both_files and a[0] == b[0] and is_text(a[0]):
+        both_files = False  # Two columns of one file: read together, same length
+        pairs = read_text(a[0], [a[1], b[1]], chunk_rows)
+    elif both_files:
+        pairs = itertools.zip_longest(chunks(a), chunks(b), fillvalue=end)
+    else:
+        pairs = zip(chunks(a), chunks(b))
+
+    start = time.perf_counter()
+    rows = errors = 0
+    text = is_text(out_path)
+    with open(out_path, "w" if text else "wb", **({"encoding": "utf-8"} if text else {})) as out:
+        for chunk_a, chunk_b in pairs:
+            if both_files and (chunk_a is end or chunk_b is end or len(chunk_a) != len(chunk_b)):
+                raise ValueError("The two columns have a different number of rows.")
+            result, mask = apply(op, chunk_a, chunk_b)
+            write_chunk(out, text, result, mask)
+            rows += len(result)
+            errors += 0 if mask is None else int(mask.sum())
+    return {"rows": rows, "errors": errors, "seconds": round(time.perf_counter() - start, 3)}
@@ -0,0 +1,321 @@
+"""
+Expression engine for the calculator.
+- split_constants: takes the numbers out of an expression, leaving its shape:
+  "(x + 1) * 2.5" -> "(x + #0) * #1" with constants (1, 2.5)
+- tokenize / parse: precedence climbing over the shape into a tree of
+  tuples, e.g. ("chain", "*", ("chain", "+", ("var", "x"), ("num", 0)), ("num", 1)).
+  A run of operators of the same precedence is one flat "chain" node, so a
+  line of thousands of terms does not make a tree thousands of levels deep
+- compile_expression: turns an expression into one Python function. Each
+  shape is compiled once (LRU cache) and reused for every line with the
+  same structure and different numbers. Constant sub-expressions are
+  computed once per expression, when it is compiled, and a sub-expression
+  that appears more than once in the same expression is evaluated once.
+  Chains longer than CHAIN_LIMIT are folded by _chain instead of one
+  Python expression, which the compiler could not take
+- evaluate_stream: one expression, or `name = expression`, per line
+
+Supported: + - * /, unary minus, parentheses, sqrt(x) and variables.
+"""
+
+import re
+from functools import lru_cache
+import math
+import operator
+
+BINARY = {"+": 1, "-": 1, "*": 2, "/": 2}  # Operator -> precedence
+OPERATORS = {"+": operator.add, "-": operator.sub, "*": operator.mul, "/": operator.truediv}
+FUNCTIONS = {"sqrt": math.sqrt}
+SHAPE_CACHE = 4096         # Distinct shapes kept compiled
+EXPRESSION_CACHE = 16384   # Distinct expressions kept bound to their numbers
+MAX_NESTING = 50           # Parentheses, functions and signs inside each other
+CHAIN_LIMIT = 256          # Terms of a chain compiled as one Python expression
+
+# Floats (group 1) and integers (group 2), not the digits inside a name like x1
+NUMBER = re.compile(r"(?<![\w.#])(?:(\d+\.\d*(?:[eE][+-]?\d+)?|\d+[eE][+-]?\d+|\.\d+(?:[eE][+-]?\d+)?)|(\d+))")
+TOKEN = re.compile(r"\s*(?:#(\d+)|([A-Za-z_]\w*)|(\S))")
+CONSTANT_REF = re.compile(r"#(\d+)")
+ASSIGNMENT = re.compile(r"\s*([A-Za-z_]\w*)\s*=(.*)$")
+
+# What a bad line can raise when it is evaluated
+ERRORS = (ArithmeticError, ValueError)
+
+
+class CalcError(ValueError):
+    pass
+
+
+# --- TOKENIZER ---
+def split_constants(text):
+    """(shape, constants): text with every number replaced by #<index> into constants.
+    Equal numbers share an index, so "(x+1)*(x+1)" keeps its repeated sub-expression."""
+    if "#" in text:
+        raise CalcError("Unexpected character '#'")
+    constants = []
+    index = {}
+
+    def number(m):
+        real, integer = m.groups()
+        value = float(real) if real else int(integer)
+        key = (type(value), value)  # 1 and 1.0 are equal, but print differently
+        if key not in index:
+            index[key] = len(constants)
+            constants.append(value)
+        return f"#{index[key]}"
+
+    return NUMBER.sub(number, text.strip()), tuple(constants)
+
+
+def tokenize(shape):
+    """[(kind, value)] with kind "num" (a constant's index), "name" or "op", ending with ("end", None)."""
+    tokens = []
+    for number, name, op in TOKEN.findall(shape):
+        if number:
+            tokens.append(("num", int(number)))
+        elif name:
+            tokens.append(("name", name))
+        elif op:
+            if op not in BINARY and op not in "()":
+                raise CalcError(f"Unexpected character '{op}'")
+            tokens.append(("op", op))
+    tokens.append(("end", None))
+    return tokens
+
+
+# --- PARSER ---
+class _Parser:
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.i = 0
+        self.depth = 0
+
+    def peek(self):
+        return self.tokens[self.i]
+
+    def next(self):
+        token = self.tokens[self.i]
+        self.i += 1
+        return token
+
+    def expect(self, op):
+        if self.next() != ("op", op):
+            raise CalcError(f"Expected '{op}'")
+
+    def nest(self):
+        self.depth += 1
+        if self.depth > MAX_NESTING:
+            raise CalcError("Expression nested too deeply")
+
+    def expression(self, prec=1):
+        """A chain of operators of precedence prec, operands of higher precedence.
+        Loops instead of recursing along the chain: only nesting recurses."""
+        if prec > max(BINARY.values()):
+            return self.unary()
+        operands = [self.expression(prec + 1)]
+        ops = ""
+        while True:
+            kind, op = self.peek()
+            if kind != "op" or BINARY.get(op) != prec:
+                break
+            self.next()
+            ops += op
+            operands.append(self.expression(prec + 1))
+        if not ops:
+            return operands[0]
+        # Evaluated left to right: a - b + c is (a - b) + c, so a constant
+        # prefix (2 * 3 in 2 * 3 * x) is a node of its own, computed once
+        n = next((i for i, child in enumerate(operands) if not _is_constant(child)), len(operands))
+        if 2 <= n < len(operands):
+            operands[:n] = [("chain", ops[:n - 1], *operands[:n])]
+            ops = ops[n - 1:]
+        return ("chain", ops, *operands)
+
+    def unary(self):
+        kind, value = self.peek()
+        if kind == "op" and value in "+-":
+            self.next()
+            self.nest()
+            operand = self.unary()
+            self.depth -= 1
+            return ("neg", operand) if value == "-" else operand
+        return self.primary()
+
+    def primary(self):
+        kind, value = self.next()
+        if kind == "num":
+            return ("num", value)
+        if kind == "name":
+            if self.peek() == ("op", "("):
+                if value not in FUNCTIONS:
+                    raise CalcError(f"Unknown function '{value}'")
+                self.next()
+                self.nest()
+                arg = self.expression()
+                self.expect(")")
+                self.depth -= 1
+                return ("call", value, arg)
+            return ("var", value)
+        if (kind, value) == ("op", "("):
+            self.nest()
+            inner = self.expression()
+            self.expect(")")
+            self.depth -= 1
+            return inner
+        if kind == "end":
+            raise CalcError("Incomplete expression")
+        raise CalcError(f"Unexpected '{_shown(kind, value)}'")
+
+
+def _shown(kind, value):
+    # Constants as they appear in the shape; compile_expression puts the numbers back
+    return f"#{value}" if kind == "num" else value
+
+
+def parse(shape):
+    parser = _Parser(tokenize(shape))
+    tree = parser.expression()
+    kind, value = parser.peek()
+    if kind != "end":
+        raise CalcError(f"Unexpected '{_shown(kind, value)}'")
+    return tree
+
+
+# --- COMPILER ---
+def _children(node):
+    return [child for child in node[1:] if isinstance(child, tuple)]
+
+
+def _is_constant(node):
+    return node[0] == "num" or (node[0] != "var" and all(_is_constant(child) for child in _children(node)))
+
+
+def _count(node, counts):
+    counts[node] = counts.get(node, 0) + 1
+    if counts[node] == 1:
+        for child in _children(node):
+            _count(child, counts)
+
+
+def _code(node, sub):
+    """Python source of one node, with sub(child) giving the source of its children."""
+    kind = node[0]
+    if kind == "num":
+        return f"c[{node[1]}]"
+    if kind == "var":
+        return f"v[{node[1]!r}]"
+    if kind == "call":
+        return f"_{node[1]}({sub(node[2])})"
+    if kind == "neg":
+        return f"(-{sub(node[1])})"
+    ops, operands = node[1], [sub(child) for child in node[2:]]
+    if len(operands) > CHAIN_LIMIT:
+        return f"_chain({ops!r}, {', '.join(operands)})"
+    return "(" + operands[0] + "".join(f" {op} {code}" for op, code in zip(ops, operands[1:])) + ")"
+
+
+def _source(node, counts, names, hoisted):
+    if node in names:
+        return names[node]  # Already computed earlier
+    if _is_constant(node):
+        # Computed once, when the expression is bound to its numbers
+        names[node] = f"_k{len(hoisted)}"
+        hoisted.append(_code(node, lambda child: _code(child, _code_constant)))
+        return names[node]
+    code = _code(node, lambda child: _source(child, counts, names, hoisted))
+    if counts[node] > 1 and node[0] != "var":
+        # Python evaluates left to right: the first occurrence stores the value
+        names[node] = f"_t{len(names)}"
+        code = f"({names[node]} := {code})"
+    return code
+
+
+def _code_constant(node):
+    return _code(node, _code_constant)
+
+
+def _chain(ops, value, *operands):
+    for op, operand in zip(ops, operands):
+        value = OPERATORS[op](value, operand)
+    return value
+
+
+_GLOBALS = {"__builtins__": {}, "_chain": _chain, **{f"_{name}": fn for name, fn in FUNCTIONS.items()}}
+
+
+@lru_cache(maxsize=SHAPE_CACHE)
+def compile_shape(shape):
+    """bind(constants) -> function(variables), for every expression of this shape."""
+    tree = parse(shape)
+    counts = {}
+    _count(tree, counts)
+    hoisted = []
+    body = _source(tree, counts, {}, hoisted)
+    lines = ["def bind(c):"] + [f"    _k{i} = {code}" for i, code in enumerate(hoisted)]
+    lines.append(f"    return lambda v: {body}")
+    namespace = {}
+    try:
+        exec("\n".join(lines), _GLOBALS, namespace)
+    except (SyntaxError, RecursionError, MemoryError):
+        # Python's own compiler limits; the ones above keep well below them
+        raise CalcError("Expression too complex")
+    return namespace["bind"]
+
+
+@lru_cache(maxsize=EXPRESSION_CACHE)
+def compile_expression(text):
+    """function(variables) computing the expression; compiled once per text.
+    Raises the error of a constant part that cannot be computed (e.g. 1/0)."""
+    shape, constants = split_constants(text)
+    try:
+        bind = compile_shape(shape)
+    except CalcError as e:
+        # "Unexpected '#1'" -> "Unexpected '4'": the number as typed
+        raise CalcError(CONSTANT_REF.sub(lambda m: str(constants[int(m.group(1))]), str(e))) from None
+    return bind(constants)
+
+
+def evaluate(text, variables=None):
+    try:
+        return compile_expression(text)(variables if variables is not None else {})
+    except KeyError as e:
+        raise CalcError(f"Unknown variable '{e.args[0]}'")
+
+
+def evaluate_line(line, variables):
+    """Evaluates one line: an expression, or `name = expression`, which also
+    stores the value in variables. Returns the value."""
+    m = ASSIGNMENT.match(line)
+    if m:
+        value = evaluate(m.group(2), variables)
+        variables[m.group(1)] = value
+        return value
+    return evaluate(line, variables)
+
+
+def evaluate_stream(lines, out, variables=None, flush_every=4096):
+    """Writes one result per input line to out ("Error: ..." for bad ones,
+    empty for blank lines and # comments, so outputs line up with inputs).
+    Returns (lines evaluated, errors)."""
+    variables = dict(variables or {})
+    buffer = []
+    count = errors = 0
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            buffer.append("")
+        else:
+            count += 1
+            try:
+                buffer.append(str(evaluate_line(line, variables)))
+            except ZeroDivisionError:
+                errors += 1
+                buffer.append("Error: division by zero")
+            except ERRORS as e:
+                errors += 1
+                buffer.append(f"Error: {e}")
+        if len(buffer) >= flush_every:
+            out.write("\n".join(buffer) + "\n")
+            buffer.clear()
+    if buffer:
+        out.write("\n".join(buffer) + "\n")
+    return count, errors
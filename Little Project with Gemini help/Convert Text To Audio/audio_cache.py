@@ -0,0 +1,137 @@
+"""
+Content-addressed cache of synthesized audio.
+Every sentence chunk is rendered once per (text, voice, rate, volume) and
+kept as <hash>.wav under CACHE_DIR, so pressing Listen or Save again, or
+editing one paragraph of a long text, only renders the chunks that changed.
+When the cache grows past its size limit the least recently used files are
+deleted. The files left by earlier runs are indexed on first use, by the
+thread that renders, so a large cache does not slow down the window's start.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+CACHE_DIR = "tts_cache"
+CACHE_MAX_MB = 200
+STALE_TMP_SECONDS = 3600  # Older temporary files were left by a crash; newer ones may still be written
+
+
+def chunk_key(chunk, settings):
+    """Hash of a chunk and the settings that change how it sounds."""
+    data = [chunk, settings.get('voice'), settings.get('rate'), settings.get('volume')]
+    return hashlib.sha1(json.dumps(data, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+class AudioCache:
+    def __init__(self, folder=CACHE_DIR, max_bytes=CACHE_MAX_MB * 1024 * 1024):
+        self.folder = folder
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # Key -> size in bytes, least recently used first
+        self._size = 0
+        self._loaded = False
+        os.makedirs(folder, exist_ok=True)
+
+    def _load(self):
+        """Indexes what earlier runs left, on first use (called with the lock
+        held): from a background thread, not while the window starts."""
+        if self._loaded:
+            return
+        self._loaded = True
+        # Their order of use is the files' modification time
+        found = []
+        stale = time.time() - STALE_TMP_SECONDS
+        for name in os.listdir(self.folder):
+            path = os.path.join(self.folder, name)
+            try:
+                if name.endswith(".wav"):
+                    st = os.stat(path)
+                    found.append((st.st_mtime, name[:-4], st.st_size))
+                elif name.endswith(".tmp") and os.path.getmtime(path) < stale:
+                    os.remove(path)  # Render interrupted by a crash
+            except OSError:
+                pass  # Removed or replaced meanwhile, by another instance
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+            self._size += size
+
+    @property
+    def size(self):
+        with self._lock:
+            self._load()
+            return self._size
+
+    def path(self, key):
+        return os.path.join(self.folder, key + ".wav")
+
+    def get(self, key):
+        """Path of the cached audio for key, or None. Marks it as just used."""
+        path = self.path(key)
+        with self._lock:
+            self._load()
+            if key not in self._entries:
+                return None
+            if not os.path.exists(path):  # Deleted behind our back
+                self._size -= self._entries.pop(key)
+                return None
+            self._entries.move_to_end(key)
+        try:
+            os.utime(path)  # Keeps the order of use for the next launch
+        except OSError:
+            pass
+        return path
+
+    def put(self, key, src, keep=()):
+        """Moves the rendered file src into the cache and returns its new path.
+        The keys in keep are not evicted (the other chunks of the same text)."""
+        path = self.path(key)
+        os.replace(src, path)
+        size = os.path.getsize(path)
+        with self._lock:
+            self._load()
+            self._size += size - self._entries.pop(key, 0)
+            self._entries[key] = size
+            self._evict(set(keep) | {key})
+        return path
+
+    def get_or_render(self, chunk, settings, render, keep=()):
+        """Path of the audio of chunk with settings. On a miss, render(path)
+        writes it to a temporary file first."""
+        key = chunk_key(chunk, settings)
+        path = self.get(key)
+        if path:
+            return path
+        tmp = os.path.join(self.folder, f"{key}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            render(tmp)
+            return self.put(key, tmp, keep)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def _evict(self, keep):
+        for key in list(self._entries):
+            if self._size <= self.max_bytes:
+                break
+            if key in keep:
+                continue
+            self._size -= self._entries.pop(key)
+            try:
+                os.remove(self.path(key))
+            except OSError:
+                pass
+
+    def clear(self):
+        with self._lock:
+            self._load()
+            for key in self._entries:
+                try:
+                    os.remove(self.path(key))
+                except OSError:
+                    pass
+            self._entries.clear()
+            self._size = 0
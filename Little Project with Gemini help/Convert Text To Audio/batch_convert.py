@@ -0,0 +1,237 @@
+"""
+Headless batch mode for the Text to Audio Converter.
+Converts every text file found in the given folders (or the given files)
+to a WAV file, with the same settings the window uses: voice, rate, volume.
+Files are converted across a pool of worker processes, each with its own
+pyttsx3 engine (engines are not thread-safe, and rendering is CPU-bound),
+and a JSON manifest records the status and timing of every file, updated
+as each one finishes.
+
+The manifest also records a hash of each input's text and settings: on the
+next run, files whose hash did not change and whose audio is still there
+are skipped, so re-running over a large folder only converts what is new.
+
+Example:
+    python batch_convert.py texts --out-dir audio --workers 4
+    python batch_convert.py texts more/chapter1.txt --voice Zira --rate 180 --force
+"""
+
+import argparse
+import datetime
+import fnmatch
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import wave
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from audio_cache import chunk_key
+from speech_chunks import split_chunks, join_wav
+
+_engine = None  # The worker process's own engine
+
+
+def find_inputs(paths, pattern, recursive):
+    """[(input path, path relative to its folder)] in a stable order."""
+    found = []
+    for path in paths:
+        if os.path.isfile(path):
+            found.append((path, os.path.basename(path)))
+            continue
+        if not os.path.isdir(path):
+            raise SystemExit(f"Not found: {path}")
+        for folder, dirs, files in os.walk(path):
+            dirs.sort()
+            if not recursive:
+                dirs.clear()
+            for name in sorted(files):
+                if fnmatch.fnmatch(name.lower(), pattern.lower()):
+                    full = os.path.join(folder, name)
+                    found.append((full, os.path.relpath(full, path)))
+    return found
+
+
+def read_jobs(inputs, settings, out_dir):
+    jobs = []
+    used = set()
+    for path, rel in inputs:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            text = f.read()
+        out = os.path.join(out_dir, os.path.splitext(rel)[0])
+        base, n = out, 1
+        while out.lower() in used:  # Same name from two folders
+            n += 1
+            out = f"{base} {n}"
+        used.add(out.lower())
+        jobs.append({"input": path, "output": out + ".wav", "hash": chunk_key(text, settings),
+                     "chars": len(text)})
+    return jobs
+
+
+def load_previous(manifest_path):
+    """Input path -> its entry in the last manifest."""
+    try:
+        with open(manifest_path, encoding="utf-8") as f:
+            return {r["input"]: r for r in json.load(f).get("files", [])}
+    except:
+        return {}
+
+
+def write_manifest(path, results, workers, settings, seconds, finished):
+    """Rewrites the manifest with the files done so far (replaced atomically,
+    so an interrupted run still leaves a valid one to skip from)."""
+    files = [r for r in results if r is not None]
+    manifest = {
+        "created": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "finished": finished,
+        "workers": workers,
+        "settings": settings,
+        "total_seconds": round(seconds, 3),
+        "ok": sum(1 for r in files if r["status"] == "ok"),
+        "skipped": sum(1 for r in files if r["status"] == "skipped"),
+        "failed": sum(1 for r in files if r["status"] == "failed"),
+        "files": files,
+    }
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=4, ensure_ascii=False)
+    os.replace(tmp, path)
+    return manifest
+
+
+def is_unchanged(job, previous):
+    prev = previous.get(job["input"])
+    return (prev is not None and prev.get("status") in ("ok", "skipped") and prev.get("hash") == job["hash"]
+            and prev.get("output") == job["output"] and os.path.exists(job["output"]))
+
+
+def resolve_voice(voice):
+    """Id of the voice given as its id or (part of) its name as shown in the
+    window. Checked once here, before any worker starts: an unknown voice
+    would otherwise fail the initializer of every worker."""
+    import pyttsx3
+    engine = pyttsx3.init()
+    try:
+        for v in engine.getProperty('voices'):
+            if voice in (v.id, v.name) or voice.lower() in v.name.lower():
+                return v.id
+    finally:
+        engine.stop()
+    raise SystemExit(f"Unknown voice: {voice}")
+
+
+# --- WORKER PROCESS ---
+def init_worker(settings):
+    global _engine
+    import pyttsx3
+    _engine = pyttsx3.init()
+    if settings.get('voice'):
+        _engine.setProperty('voice', settings['voice'])  # Already resolved to its id by main
+    _engine.setProperty('rate', settings['rate'])
+    _engine.setProperty('volume', settings['volume'])
+
+
+def render(text, path):
+    _engine.save_to_file(text, path)
+    _engine.runAndWait()
+
+
+def run_job(job):
+    # Runs inside a worker process: one chunk at a time, like the window's Save
+    start = time.perf_counter()
+    result = dict(job)
+    tmp_dir = tempfile.mkdtemp(prefix="tts_batch_")
+    try:
+        with open(job["input"], encoding="utf-8", errors="replace") as f:
+            text = f.read().strip()
+        chunks = split_chunks(text)
+        if not chunks:
+            raise ValueError("The file is empty.")
+        os.makedirs(os.path.dirname(job["output"]) or ".", exist_ok=True)
+        parts = []
+        for i, chunk in enumerate(chunks, 1):
+            part = os.path.join(tmp_dir, f"{i:05d}.wav")
+            render(chunk, part)
+            parts.append(part)
+        try:
+            join_wav(parts, job["output"])
+        except wave.Error:
+            # The driver did not write WAV (e.g. AIFF on macOS): render it in one call instead
+            render(text, job["output"])
+        result["chunks"] = len(chunks)
+        result["status"] = "ok"
+    except Exception as e:
+        result["status"] = "failed"
+        result["error"] = str(e)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    result["seconds"] = round(time.perf_counter() - start, 3)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert folders of text files to audio without the GUI.")
+    parser.add_argument("inputs", nargs="+", help="Folders and/or text files to convert")
+    parser.add_argument("--out-dir", default="audio", help="Where the audio files are written (default: audio)")
+    parser.add_argument("--pattern", default="*.txt", help="Files to take from the folders (default: *.txt)")
+    parser.add_argument("--recursive", action="store_true", help="Also look in subfolders")
+    parser.add_argument("--voice", default=None, help="Voice id or name (default: the system voice)")
+    parser.add_argument("--rate", type=int, default=150, help="Words per minute (default: 150)")
+    parser.add_argument("--volume", type=float, default=1.0, help="From 0 to 1 (default: 1)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument("--manifest", default=None, help="Manifest path (default: <out-dir>/manifest.json)")
+    parser.add_argument("--force", action="store_true", help="Convert every file, even the unchanged ones")
+    args = parser.parse_args(argv)
+
+    if not 0 <= args.volume <= 1:
+        raise SystemExit("--volume must be between 0 and 1.")
+    # Same settings model as TextToAudioApp.get_engine_properties
+    voice = resolve_voice(args.voice) if args.voice else None
+    settings = {'rate': args.rate, 'volume': round(args.volume, 2), 'voice': voice}
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    manifest_path = args.manifest or os.path.join(args.out_dir, "manifest.json")
+    jobs = read_jobs(find_inputs(args.inputs, args.pattern, args.recursive), settings, args.out_dir)
+    if not jobs:
+        print("No text files to convert.")
+        return 0
+
+    previous = {} if args.force else load_previous(manifest_path)
+    results = [None] * len(jobs)
+    todo = []
+    for i, job in enumerate(jobs):
+        if is_unchanged(job, previous):
+            results[i] = dict(job, chunks=previous[job["input"]].get("chunks"), status="skipped", seconds=0)
+        else:
+            todo.append(i)
+
+    print(f"Converting {len(todo)} of {len(jobs)} files with {args.workers} workers "
+          f"({len(jobs) - len(todo)} unchanged)...")
+    start = time.perf_counter()
+    if todo:
+        with ProcessPoolExecutor(max_workers=min(args.workers, len(todo)), initializer=init_worker,
+                                 initargs=(settings,)) as pool:
+            futures = {pool.submit(run_job, jobs[i]): i for i in todo}
+            for future in as_completed(futures):
+                i = futures[future]
+                try:
+                    results[i] = future.result()
+                except Exception as e:
+                    # The worker process itself died (or its engine could not start)
+                    results[i] = dict(jobs[i], status="failed", error=str(e), seconds=None)
+                r = results[i]
+                print(f"[{r['status'].upper()}] {r['input']} ({r['seconds']}s)")
+                # Every finished file is recorded at once: a run stopped halfway
+                # still skips what it converted the next time
+                write_manifest(manifest_path, results, args.workers, settings, time.perf_counter() - start, False)
+
+    manifest = write_manifest(manifest_path, results, args.workers, settings, time.perf_counter() - start, True)
+    print(f"Manifest written to {manifest_path}")
+    return 0 if manifest["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
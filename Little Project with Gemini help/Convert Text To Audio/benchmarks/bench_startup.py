@@ -0,0 +1,104 @@
+"""
+Startup benchmark for the Text to Audio Converter.
+Every measurement runs in a fresh interpreter, so nothing is already
+imported or cached in memory:
+- first window: time from process start until the main window is mapped,
+  i.e. until the user can type (time to interactive)
+- voices: time until the engine has listed the installed voices
+- the app's own milestones (engine up, voice menu filled from the cache)
+Runs are made both cold (no voice cache on disk) and warm.
+
+    python benchmarks/bench_startup.py --runs 10
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = os.path.dirname(HERE)
+
+STARTUP_SCRIPT = """
+import json, time
+t = time.perf_counter()
+import tkinter as tk
+from convert_text_to_audio import TextToAudioApp
+root = tk.Tk()
+app = TextToAudioApp(root)
+while not root.winfo_viewable():
+    root.update()
+window = time.perf_counter() - t
+while not app.voices_loaded:
+    root.update()
+    time.sleep(0.001)
+voices = time.perf_counter() - t
+app.speech.close()
+root.destroy()
+print(json.dumps({"window": window, "voices": voices, "milestones": app.startup}))
+"""
+
+
+def run(cold):
+    """Runs the app once in a fresh interpreter from the app directory.
+    Returns (its JSON output, wall time including interpreter start)."""
+    from speech_engine import VOICE_CACHE
+    if cold and os.path.exists(os.path.join(APP_DIR, VOICE_CACHE)):
+        os.remove(os.path.join(APP_DIR, VOICE_CACHE))
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-c", STARTUP_SCRIPT], cwd=APP_DIR,
+                          capture_output=True, text=True, timeout=120)
+    wall = time.perf_counter() - start
+    if proc.returncode != 0:
+        lines = proc.stderr.strip().splitlines()
+        raise RuntimeError(lines[-1] if lines else f"exit code {proc.returncode}")
+    return json.loads(proc.stdout.strip().splitlines()[-1]), wall
+
+
+def measure(cold, runs):
+    window, voices, wall, last = [], [], [], None
+    for _ in range(runs):
+        last, w = run(cold)
+        window.append(last["window"])
+        voices.append(last["voices"])
+        wall.append(w)
+    return {
+        "window_median_ms": round(statistics.median(window) * 1000, 1),
+        "voices_median_ms": round(statistics.median(voices) * 1000, 1),
+        "median_wall_ms": round(statistics.median(wall) * 1000, 1),
+        "milestones": last["milestones"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time to interactive of the Text to Audio Converter.")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per measurement")
+    parser.add_argument("--json", default=None, metavar="PATH", help="Also write the results to PATH")
+    args = parser.parse_args()
+    sys.path.insert(0, APP_DIR)
+
+    results = {}
+    for name, cold in (("cold (no voice cache)", True), ("warm", False)):
+        try:
+            r = measure(cold, args.runs)
+        except Exception as e:
+            print(f"{name}: skipped ({e})")
+            continue
+        results[name] = r
+        print(f"{name}: first window {r['window_median_ms']:.1f} ms, voices {r['voices_median_ms']:.1f} ms "
+              f"median ({r['median_wall_ms']:.0f} ms with interpreter start)")
+        print(f"  milestones of the last run: {r['milestones']}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"created": time.strftime("%Y-%m-%d %H:%M:%S"), "runs": args.runs, "results": results},
+                      f, indent=4)
+        print(f"\nResults written to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
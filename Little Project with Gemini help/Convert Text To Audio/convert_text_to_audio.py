@@ -1,30 +1,53 @@
-
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-import pyttsx3
 import threading
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from audio_cache import AudioCache, chunk_key
+from speech_chunks import split_chunks, join_wav, can_play, play_file
+from speech_engine import SpeechWorker, load_cached_voices, save_cached_voices
+
+VOICES_PLACEHOLDER = "Loading voices..."
 
 class TextToAudioApp:
     def __init__(self, root):
         """
         Initialize the main application.
         Sets up the window, title, dimensions, and starts the audio engine.
+        The engine and the voice list load in the background: the window
+        is usable right away, with the voices of the last launch if any.
         """
+        self.started = time.perf_counter()
+        self.startup = {}  # Milestone -> ms since start, to track time to interactive
+        self.voices_loaded = False
         self.root = root
         self.root.title("Advanced Text to Audio Converter")
         self.root.geometry("600x550")
         self.root.resizable(False, False)
 
-        # Initialize pyttsx3 engine
-        try:
-            self.engine = pyttsx3.init()
-        except Exception as e:
-            messagebox.showerror("Initialization Error", f"Unable to initialize audio engine: {e}")
-            self.root.destroy()
-            return
+        self.cancel_event = threading.Event()
+        self.preview_stop = threading.Event()
+        # Rendered chunks, shared by preview and save
+        self.cache = AudioCache()
+
+        # The pyttsx3 engine lives on its own thread; we send it commands
+        self.speech = SpeechWorker()
+        self.speech.ready.add_done_callback(lambda f: self._mark("engine"))
 
+        self.voice_map = {}
         self.create_widgets()
-        self.load_voices()
+        cached = load_cached_voices()
+        if cached:
+            self.load_voices(cached)
+            self._mark("voices (cached)")
+        self._mark("widgets")
+
+        self.speech.voices().add_done_callback(lambda f: self.root.after(0, self._on_voices_listed, f))
+
+    def _mark(self, milestone):
+        """Records when a startup milestone was first reached (any thread)."""
+        self.startup.setdefault(milestone, round((time.perf_counter() - self.started) * 1000, 1))
 
     def create_widgets(self):
         """
@@ -52,7 +75,10 @@ class TextToAudioApp:
 
         # Voice Selection
         ttk.Label(settings_frame, text="Voice:").grid(row=0, column=0, padx=5, pady=5, sticky="w")
-        self.voice_combo = ttk.Combobox(settings_frame, state="readonly", width=40)
+        # Disabled with a placeholder until the engine has listed the voices
+        self.voice_combo = ttk.Combobox(settings_frame, values=[VOICES_PLACEHOLDER], width=40)
+        self.voice_combo.current(0)
+        self.voice_combo.config(state="disabled")
         self.voice_combo.grid(row=0, column=1, padx=5, pady=5, sticky="w")
         self.voice_combo.bind("<<ComboboxSelected>>", self.change_voice)
 
@@ -87,11 +113,17 @@ class TextToAudioApp:
         self.filename_entry.pack(side="left", padx=5)
 
         # Buttons
+        self.stop_btn = ttk.Button(actions_frame, text="Stop", command=self.stop_preview, state="disabled")
+        self.stop_btn.pack(side="right", padx=5)
+
         self.listen_btn = ttk.Button(actions_frame, text="Listen Preview", command=self.listen_text)
         self.listen_btn.pack(side="right", padx=5)
 
-        save_btn = ttk.Button(actions_frame, text="Save (.mp3)", command=self.save_audio)
-        save_btn.pack(side="right", padx=5)
+        self.save_btn = ttk.Button(actions_frame, text="Save (.wav)", command=self.save_audio)
+        self.save_btn.pack(side="right", padx=5)
+
+        # Only shown while a file is being saved
+        self.cancel_btn = ttk.Button(actions_frame, text="Cancel", command=self.cancel_save)
 
         # Status Bar
         self.status_var = tk.StringVar()
@@ -99,20 +131,44 @@ class TextToAudioApp:
         status_bar = ttk.Label(self.root, textvariable=self.status_var, relief="sunken", anchor="w")
         status_bar.pack(side="bottom", fill="x")
 
-    def load_voices(self):
+    def _on_voices_listed(self, future):
         """
-        Retrieves voices installed on the operating system (e.g., Windows/macOS)
-        and loads them into the dropdown (Combobox) for the user to choose.
+        Runs on the Tk thread once the engine has listed the voices installed
+        on the operating system (e.g., Windows/macOS), or failed to start.
         """
+        error = self.speech.ready.exception()
+        if error:
+            messagebox.showerror("Initialization Error", f"Unable to initialize audio engine: {error}")
+            self.root.destroy()
+            return
         try:
-            self.voices = self.engine.getProperty('voices')
-            voice_names = [f"{v.name}" for v in self.voices]
-            self.voice_map = {f"{v.name}": v.id for v in self.voices}
-            self.voice_combo['values'] = voice_names
-            if voice_names:
-                self.voice_combo.current(0)
+            voices = future.result()
         except Exception as e:
-             messagebox.showwarning("Warning", f"Unable to load voices: {e}")
+            messagebox.showwarning("Warning", f"Unable to load voices: {e}")
+            return
+        self.load_voices(voices)
+        self.voices_loaded = True
+        self._mark("voices")
+        save_cached_voices(voices)
+
+    def load_voices(self, voices):
+        """
+        Loads the voices, as (id, name) pairs, into the dropdown (Combobox)
+        for the user to choose. Keeps the selected voice if it is still there.
+        """
+        selected = self.voice_combo.get()
+        self.voices = voices
+        voice_names = [f"{name}" for _, name in self.voices]
+        self.voice_map = {f"{name}": voice_id for voice_id, name in self.voices}
+        self.voice_combo.config(state="readonly")
+        self.voice_combo['values'] = voice_names
+        if selected in self.voice_map:
+            self.voice_combo.set(selected)
+        elif voice_names:
+            self.voice_combo.current(0)
+            self.change_voice()
+        else:
+            self.voice_combo.set("")
 
     def update_rate_label(self, value):
         """
@@ -133,36 +189,32 @@ class TextToAudioApp:
     def change_voice(self, event=None):
         """
         Called when the user selects a new voice from the dropdown.
-        Immediately applies the selected voice to the engine.
+        Sends the selected voice to the engine thread right away,
+        so the next preview starts without switching voice.
         """
         selected_name = self.voice_combo.get()
         if selected_name in self.voice_map:
-            self.engine.setProperty('voice', self.voice_map[selected_name])
+            self.speech.set_property('voice', self.voice_map[selected_name])
 
     def get_engine_properties(self):
         """
-        Reads current values from sliders (Rate, Volume) and the menu (Voice)
-        and applies them to the pyttsx3 engine.
-        Ensures audio uses the latest settings before speaking or saving.
+        Reads current values from sliders (Rate, Volume) and the menu (Voice).
+        Returns them as a dict that goes with every speak/save command:
+        the engine thread only applies the ones that changed.
+        Must be called on the Tk thread.
         """
-        # Update Rate
-        rate = int(self.rate_scale.get())
-        self.engine.setProperty('rate', rate)
-        
-        # Update Volume
-        volume = float(self.volume_scale.get())
-        self.engine.setProperty('volume', volume)
-
-        # Update Voice - ensure it's set
         selected_name = self.voice_combo.get()
-        if selected_name in self.voice_map:
-            self.engine.setProperty('voice', self.voice_map[selected_name])
+        return {
+            'rate': int(self.rate_scale.get()),
+            'volume': round(float(self.volume_scale.get()), 2),
+            'voice': self.voice_map.get(selected_name),
+        }
 
     def listen_text(self):
         """
         Action for the 'Listen Preview' button.
-        Takes the text and starts reading it in a separate thread
-        to prevent the UI from freezing during audio playback.
+        Takes the text and queues it to the engine thread,
+        so the UI does not freeze during audio playback.
         """
         text = self.text_area.get("1.0", tk.END).strip()
         if not text:
@@ -171,31 +223,73 @@ class TextToAudioApp:
 
         self.status_var.set("Playback in progress...")
         self.listen_btn.config(state="disabled")
-        
-        # Run in a separate thread to keep UI responsive
-        threading.Thread(target=self._run_speak_thread, args=(text,), daemon=True).start()
+        self.stop_btn.config(state="normal")
+        settings = self.get_engine_properties()
+
+        if can_play():
+            # Played chunk by chunk from the audio cache: text heard before starts at once
+            self.preview_stop.clear()
+            threading.Thread(target=self._run_preview_thread, args=(text, settings), daemon=True).start()
+        else:
+            # No way to play files here: the engine speaks it directly
+            future = self.speech.speak(text, settings)
+            future.add_done_callback(lambda f: self.root.after(
+                0, self._on_preview_done, f.exception(), not f.exception() and f.result()))
+
+    def stop_preview(self):
+        """
+        Action for the 'Stop' button: interrupts the preview.
+        """
+        self.preview_stop.set()
+        self.speech.stop()
 
-    def _run_speak_thread(self, text):
+    def _cached_chunk(self, chunk, settings, keep=()):
         """
-        This function runs in the background (thread).
-        It actually commands the engine to speak.
+        Path of the audio of one chunk, rendered by the engine thread
+        only if it is not in the cache yet.
         """
+        return self.cache.get_or_render(
+            chunk, settings, lambda path: self.speech.save(chunk, path, settings).result(), keep)
+
+    def _run_preview_thread(self, text, settings):
+        """
+        Runs in the background (thread).
+        Plays the chunks in order; the next one is rendered while
+        the current one plays.
+        """
+        chunks = split_chunks(text)
+        keys = [chunk_key(chunk, settings) for chunk in chunks]
+        renders = ThreadPoolExecutor(max_workers=1)
+        error = None
         try:
-            self.get_engine_properties()
-            self.engine.say(text)
-            self.engine.runAndWait()
+            futures = [renders.submit(self._cached_chunk, chunk, settings, keys) for chunk in chunks]
+            for future in futures:
+                path = future.result()
+                if self.preview_stop.is_set():
+                    break
+                play_file(path, self.preview_stop)
         except Exception as e:
-            # Schedule the error message on the main thread
-            self.root.after(0, lambda: messagebox.showerror("Audio Error", f"Error during playback: {e}"))
+            error = e
         finally:
-            self.root.after(0, lambda: self.status_var.set("Ready"))
-            self.root.after(0, lambda: self.listen_btn.config(state="normal"))
+            renders.shutdown(wait=False, cancel_futures=True)
+        self.root.after(0, self._on_preview_done, error, not self.preview_stop.is_set())
+
+    def _on_preview_done(self, error, completed):
+        """
+        Runs on the Tk thread when a preview ends (finished, stopped or failed).
+        """
+        if error:
+            messagebox.showerror("Audio Error", f"Error during playback: {error}")
+        self.status_var.set("Ready" if error or completed else "Preview stopped")
+        self.listen_btn.config(state="normal")
+        self.stop_btn.config(state="disabled")
 
     def save_audio(self):
         """
-        Action for the 'Save (.mp3)' button.
-        Takes the text, sets the properties, and saves the output to an audio file
-        instead of playing it through speakers.
+        Action for the 'Save (.wav)' button.
+        Takes the text and saves it to an audio file in a background thread,
+        one chunk of sentences at a time, so the window stays responsive
+        and the save can be cancelled between chunks.
         """
         text = self.text_area.get("1.0", tk.END).strip()
         if not text:
@@ -207,26 +301,66 @@ class TextToAudioApp:
             messagebox.showinfo("Info", "Enter a filename.")
             return
         
-        if not filename.endswith(".mp3"):
-            filename += ".mp3"
+        # pyttsx3 drivers write WAV data, whatever the extension
+        if not filename.endswith(".wav"):
+            filename += ".wav"
 
         # Optional: Let user choose directory via dialog if they want, 
         # but for now we follow the "dynamic filename" requirement simply.
         # Could enhance by opening a file dialog.
         
         self.status_var.set(f"Saving {filename}...")
-        
+        self.save_btn.config(state="disabled")
+        self.cancel_btn.pack(side="right", padx=5)
+        self.cancel_event.clear()
+        settings = self.get_engine_properties()
+        threading.Thread(target=self._run_save_thread, args=(text, filename, settings), daemon=True).start()
+
+    def cancel_save(self):
+        """
+        Action for the 'Cancel' button: stops the save after the chunk
+        that is being rendered right now.
+        """
+        self.cancel_event.set()
+        self.status_var.set("Cancelling...")
+
+    def _run_save_thread(self, text, filename, settings):
+        """
+        Runs in the background (thread).
+        Takes every chunk from the audio cache (the engine thread renders the
+        missing ones), in order, then joins them into the final file.
+        Progress goes to the status bar. A preview asked for meanwhile
+        only waits for one chunk.
+        """
+        chunks = split_chunks(text)
+        keys = [chunk_key(chunk, settings) for chunk in chunks]
         try:
-            self.get_engine_properties()
-            self.engine.save_to_file(text, filename)
-            self.engine.runAndWait()
-            messagebox.showinfo("Success", f"File saved successfully:\n{filename}")
-            self.status_var.set("Save completed")
+            parts = []
+            for i, chunk in enumerate(chunks, 1):
+                if self.cancel_event.is_set():
+                    self.root.after(0, lambda: self.status_var.set("Save cancelled"))
+                    return
+                parts.append(self._cached_chunk(chunk, settings, keys))
+                progress = f"Saving {filename}: chunk {i}/{len(chunks)} ({i * 100 // len(chunks)}%)"
+                self.root.after(0, lambda p=progress: self.status_var.set(p))
+
+            try:
+                join_wav(parts, filename)
+            except wave.Error:
+                # The driver did not write WAV (e.g. AIFF on macOS): render it in one call instead
+                self.speech.save(text, filename, settings).result()
+            self.root.after(0, lambda: messagebox.showinfo("Success", f"File saved successfully:\n{filename}"))
+            self.root.after(0, lambda: self.status_var.set("Save completed"))
         except Exception as e:
-            messagebox.showerror("Save Error", f"Unable to save file: {e}")
-            self.status_var.set("Error during save")
+            err = str(e)
+            self.root.after(0, lambda: messagebox.showerror("Save Error", f"Unable to save file: {err}"))
+            self.root.after(0, lambda: self.status_var.set("Error during save"))
+        finally:
+            self.root.after(0, lambda: self.save_btn.config(state="normal"))
+            self.root.after(0, self.cancel_btn.pack_forget)
 
 if __name__ == "__main__":
     root = tk.Tk()
     app = TextToAudioApp(root)
-    root.mainloop()
\ No newline at end of file
+    root.mainloop()
+    app.speech.close()
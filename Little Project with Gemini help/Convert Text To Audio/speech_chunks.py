@@ -0,0 +1,102 @@
+"""
+Helpers for synthesizing long texts a piece at a time.
+- split_chunks: cuts the text at sentence boundaries into chunks of at most
+  MAX_CHUNK_CHARS characters; a blank line always ends a chunk, so editing
+  one paragraph never moves the chunks of the others
+- join_wav: concatenates the WAV files rendered for each chunk into one
+- play_file: plays one rendered chunk, so a preview can come from the cache
+"""
+
+import re
+import shutil
+import subprocess
+import sys
+import wave
+
+try:
+    import winsound
+except ImportError:
+    winsound = None
+
+MAX_CHUNK_CHARS = 400
+
+SENTENCE_END = re.compile(r"(?<=[.!?;:…])\s+")
+PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+
+
+def _split_long(sentence, max_chars):
+    # A single sentence longer than a chunk: cut at the last space that fits
+    while len(sentence) > max_chars:
+        cut = sentence.rfind(" ", 0, max_chars)
+        if cut <= 0:
+            cut = max_chars
+        yield sentence[:cut].strip()
+        sentence = sentence[cut:].strip()
+    if sentence:
+        yield sentence
+
+
+def split_chunks(text, max_chars=MAX_CHUNK_CHARS):
+    """Returns the text as a list of chunks, in order."""
+    chunks = []
+    for paragraph in PARAGRAPH_BREAK.split(text):
+        current = ""
+        for sentence in SENTENCE_END.split(" ".join(paragraph.split())):
+            for piece in _split_long(sentence, max_chars):
+                if current and len(current) + 1 + len(piece) > max_chars:
+                    chunks.append(current)
+                    current = piece
+                else:
+                    current = f"{current} {piece}" if current else piece
+        if current:
+            chunks.append(current)
+    return chunks
+
+
+def join_wav(paths, out_path):
+    """Writes the audio of every WAV in paths, in order, to out_path.
+    Raises wave.Error if a part is not WAV or their formats differ."""
+    params = None
+    with wave.open(out_path, "wb") as out:
+        for path in paths:
+            with wave.open(path, "rb") as part:
+                if params is None:
+                    params = part.getparams()
+                    out.setparams(params)
+                elif part.getparams()[:3] != params[:3]:
+                    raise wave.Error("Chunks were rendered in different audio formats.")
+                out.writeframes(part.readframes(part.getnframes()))
+
+
+# --- PLAYBACK ---
+def _player_command():
+    # Command line players that come with the system (pyttsx3 on macOS renders AIFF: afplay reads both)
+    candidates = [["afplay"]] if sys.platform == "darwin" else [["aplay", "-q"], ["paplay"],
+                                                                ["ffplay", "-nodisp", "-autoexit", "-loglevel", "quiet"]]
+    for cmd in candidates:
+        if shutil.which(cmd[0]):
+            return cmd
+    return None
+
+
+PLAYER = None if winsound else _player_command()
+
+
+def can_play():
+    return bool(winsound or PLAYER)
+
+
+def play_file(path, stop):
+    """Plays an audio file until it ends or stop (a threading.Event) is set."""
+    if winsound:
+        with wave.open(path, "rb") as w:
+            seconds = w.getnframes() / w.getframerate()
+        winsound.PlaySound(path, winsound.SND_FILENAME | winsound.SND_ASYNC)
+        if stop.wait(seconds):
+            winsound.PlaySound(None, 0)
+        return
+    proc = subprocess.Popen(PLAYER + [path], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    while proc.poll() is None:
+        if stop.wait(0.05):
+            proc.terminate()
+            proc.wait()
@@ -0,0 +1,158 @@
+"""
+Single owner thread for the pyttsx3 engine.
+pyttsx3 engines are not thread-safe (and SAPI5 wants to be used from the
+thread that created it), so one worker thread creates the engine, keeps it
+warm and runs every command from a queue, one at a time:
+speak, save, set property, voices. Properties are only sent to the engine
+when their value changes. stop() interrupts a running preview at the next
+word and skips the previews that were queued before it.
+
+The engine starts (and pyttsx3 is imported) on the worker thread, so the
+window can be shown meanwhile; the voice list of the last launch is kept
+in VOICE_CACHE to fill the voice menu before the engine is up.
+"""
+
+import json
+import os
+import platform
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import Future
+
+from audio_cache import CACHE_DIR
+
+VOICE_CACHE = os.path.join(CACHE_DIR, "voices.json")
+VOICE_CACHE_DAYS = 7  # Older lists are not trusted, voices may have been installed since
+
+
+class SpeechWorker:
+    def __init__(self, driver_name=None):
+        self._commands = queue.Queue()
+        self._applied = {}              # Property -> value the engine has now
+        # Every speak remembers the stop() count when it was queued: a later stop() makes it stale
+        self._stops = 0
+        self._playing = None
+        self.engine = None
+        self.ready = Future()           # Result: None once the engine is up, or the init error
+        self._thread = threading.Thread(target=self._run, args=(driver_name,), name="speech-engine", daemon=True)
+        self._thread.start()
+
+    # --- Commands (any thread) ---
+    def _submit(self, kind, *args):
+        future = Future()
+        self._commands.put((kind, args, future))
+        return future
+
+    def speak(self, text, settings=None):
+        """Plays text. settings: {'rate': ..., 'volume': ..., 'voice': ...}."""
+        return self._submit("speak", text, settings or {}, self._stops)
+
+    def save(self, text, path, settings=None):
+        return self._submit("save", text, path, settings or {})
+
+    def set_property(self, name, value):
+        return self._submit("set", {name: value})
+
+    def voices(self):
+        """Future of [(id, name)] for the installed voices."""
+        return self._submit("voices")
+
+    def stop(self):
+        """Interrupts the preview being played and skips the queued ones."""
+        self._stops += 1
+
+    def close(self):
+        self.stop()
+        self._commands.put(("quit", (), Future()))
+
+    # --- Engine thread ---
+    def _apply(self, settings):
+        for name, value in settings.items():
+            if value is not None and self._applied.get(name) != value:
+                self.engine.setProperty(name, value)
+                self._applied[name] = value
+
+    def _on_word(self, name, location, length):
+        if self._playing is not None and self._playing < self._stops:
+            self.engine.stop()
+
+    def _run(self, driver_name):
+        try:
+            import pyttsx3
+            self.engine = pyttsx3.init(driver_name)
+            self.engine.connect("started-word", self._on_word)
+        except Exception as e:
+            self.ready.set_exception(e)
+            # Commands sent before (or after) the failure get the init error
+            while True:
+                kind, args, future = self._commands.get()
+                if kind == "quit":
+                    return
+                if future.set_running_or_notify_cancel():
+                    future.set_exception(e)
+        self.ready.set_result(None)
+
+        while True:
+            kind, args, future = self._commands.get()
+            if kind == "quit":
+                break
+            if not future.set_running_or_notify_cancel():
+                continue  # Cancelled while waiting
+            try:
+                if kind == "speak":
+                    text, settings, queued_at = args
+                    if queued_at < self._stops:
+                        future.set_result(False)  # Stopped before its turn came
+                        continue
+                    self._apply(settings)
+                    self._playing = queued_at
+                    try:
+                        self.engine.say(text)
+                        self.engine.runAndWait()
+                    finally:
+                        self._playing = None
+                    future.set_result(queued_at == self._stops)  # False: stopped by the user
+                elif kind == "save":
+                    text, path, settings = args
+                    self._apply(settings)
+                    self.engine.save_to_file(text, path)
+                    self.engine.runAndWait()
+                    future.set_result(path)
+                elif kind == "set":
+                    self._apply(args[0])
+                    future.set_result(None)
+                elif kind == "voices":
+                    future.set_result([(v.id, v.name) for v in self.engine.getProperty("voices")])
+            except Exception as e:
+                future.set_exception(e)
+
+
+# --- Voice list cache ---
+def _system_id():
+    # A different OS build or Python may come with other voices
+    return f"{sys.platform} {platform.release()} {platform.python_version()}"
+
+
+def load_cached_voices(path=VOICE_CACHE):
+    """[(id, name)] saved by the last launch, or None if missing or stale."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data["system"] != _system_id() or time.time() - data["saved"] > VOICE_CACHE_DAYS * 86400:
+            return None
+        return [(v[0], v[1]) for v in data["voices"]]
+    except:
+        return None
+
+
+def save_cached_voices(voices, path=VOICE_CACHE):
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"system": _system_id(), "saved": time.time(), "voices": voices}, f, ensure_ascii=False)
+        os.replace(tmp, path)
+    except:
+        pass
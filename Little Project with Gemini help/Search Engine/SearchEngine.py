@@ -1,404 +1,365 @@
-import wikipedia
-from duckduckgo_search import DDGS
-from fpdf import FPDF
 import datetime
-import requests
-from bs4 import BeautifulSoup
+import time
 import os
-from PIL import Image
-import customtkinter as ctk
+import io
+import sys
 import threading
-import tkinter.messagebox as msgbox
-from tkinter import filedialog
-import matplotlib.pyplot as plt
-from collections import Counter
-import re
-import json
-from docx import Document
-from docx.shared import Inches
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+import http_client
+import research_cache
+import wiki_client
+import history_store
+import search_index
+import instrumentation
+from budget import Budget, ReportCancelled
+import scraper
+import image_pipeline
+import keywords
+import report_model
+from report_model import Report
+
+# Heavy dependencies (duckduckgo_search, matplotlib, fpdf, python-docx, PIL,
+# customtkinter) are imported on first use: batch tools only need
+# generate_report, and the window should not wait for any of them.
+
+def DDGS(*args, **kwargs):
+    from duckduckgo_search import DDGS as _DDGS
+    return _DDGS(*args, **kwargs)
 
 # --- CONFIG & UTILS ---
-HISTORY_FILE = "search_history.json"
-
-def clean_text(text):
-    if not text: return ""
-    replacements = {
-        '€': 'EUR', '”': '"', '“': '"', '’': "'", '‘': "'", '–': '-', '…': '...',
-        'à': 'a', 'è': 'e', 'é': 'e', 'ì': 'i', 'ò': 'o', 'ù': 'u',
-        'Á': 'A', 'É': 'E', 'Í': 'I', 'Ó': 'O', 'Ú': 'U',
-        'ä': 'a', 'ö': 'o', 'ü': 'u', 'ß': 'ss', 'ñ': 'n'
-    }
-    for k, v in replacements.items():
-        text = text.replace(k, v)
-    return text.encode('latin-1', 'replace').decode('latin-1')
-
-def load_history():
-    if os.path.exists(HISTORY_FILE):
-        try:
-            with open(HISTORY_FILE, "r") as f:
-                return json.load(f)
-        except:
-            return []
-    return []
-
-def save_to_history(topic, filepath):
-    history = load_history()
-    entry = {
-        "topic": topic,
-        "date": datetime.datetime.now().strftime("%Y-%m-%d %H:%M"),
-        "path": filepath
-    }
-    # Avoid identical recent duplicates
-    if history and history[0]['topic'] == topic and history[0]['path'] == filepath:
-        return
-    history.insert(0, entry) # Aggiungi in cima
-    if len(history) > 20: history = history[:20] # Mantieni solo gli ultimi 20
-    
-    with open(HISTORY_FILE, "w") as f:
-        json.dump(history, f, indent=4)
+LANG_MAP = {"Italiano": "it", "English": "en", "Français": "fr", "Español": "es", "Deutsch": "de"}
+MAX_FETCH_WORKERS = 8  # Total parallel fetches per report (per-host cap lives in http_client)
+CHART_LOCK = threading.Lock()  # matplotlib is not thread-safe: concurrent reports take turns
+
+def load_history(limit=20, offset=0):
+    return history_store.get_store().page(offset, limit)
+
+def save_to_history(topic, filepath, lang=None, depth=None, fmt=None, data=None):
+    history_store.get_store().add(topic, filepath, lang, depth, fmt, data=data)
 
-def download_image(topic):
+def index_report(topic, wiki_summary, web_results, save_path, lang, depth, export_format):
+    # Keeps everything we collected searchable after the file is written
+    parts = [topic, topic, wiki_summary]
+    for res in web_results:
+        parts += [res['title'], res['body'], res['href']]
     try:
-        page = wikipedia.page(topic)
-        if page.images:
-            for img_url in page.images[:5]:
+        search_index.get_index().add(
+            " ".join(parts), topic=topic, path=save_path, lang=lang, depth=depth, format=export_format,
+            date=datetime.datetime.now().strftime("%Y-%m-%d %H:%M"), snippet=search_index.snippet(wiki_summary),
+        )
+    except Exception as e:
+        print(f"Search index: {e}")
+
+def download_image(topic, timeout=5, should_stop=None, code="it"):
+    # Returns print-sized JPEG bytes (no temp file), or None
+    try:
+        images = wiki_client.image_urls(topic, code, timeout)[:5]
+        if images:
+            for img_url in images:
                 if img_url.lower().endswith(('.jpg', '.png', '.jpeg')):
-                    response = requests.get(img_url, stream=True, timeout=5)
-                    if response.status_code == 200:
-                        filename = f"temp_{topic.replace(' ', '')}.jpg"
-                        with open(filename, 'wb') as f:
-                            f.write(response.content)
-                        return filename
+                    if should_stop and should_stop(): break
+                    data = image_pipeline.download(img_url, timeout=timeout, should_stop=should_stop)
+                    if data:
+                        return image_pipeline.fit_for_print(data)
     except:
         pass
     return None
 
-def smart_scrape(url):
+def smart_scrape(url, timeout=4, should_stop=None):
     try:
-        headers = {'User-Agent': "Mozilla/5.0"}
-        response = requests.get(url, headers=headers, timeout=4)
-        soup = BeautifulSoup(response.content, 'html.parser')
-        paragraphs = soup.find_all('p')
-        text = " ".join([p.get_text() for p in paragraphs[:3]])
+        response = http_client.get(url, stream=True, timeout=timeout)
+        if not scraper.is_html(response):
+            response.close()
+            return "No textual content found."
+        # Stops reading as soon as 3 paragraphs / 400 chars have arrived
+        text, read = scraper.stream_paragraphs(response, max_paragraphs=3, max_chars=400, should_stop=should_stop)
+        instrumentation.add_bytes(read)
         if len(text) > 400: text = text[:400] + "..."
         return text.strip() or "No textual content found."
     except:
         return "Site access failed."
 
-def create_chart(text_data, topic):
+# --- PARALLEL FETCH ---
+def fetch_summary(topic, sentences, code="it", timeout=5):
     try:
-        # Find words > 4 letters
-        words = re.findall(r'\b\w{5,}\b', text_data.lower())
-        ignore = {'anche', 'della', 'delle', 'nella', 'hanno', 'stato', 'sono', 'come', 'questo', 'questa', 'degli', 'parte', 'prima', 'dopo', 'tutto', 'tutti', 'fatto', 'essere', 'avere', 'which', 'their', 'about', 'would', 'these', 'other', 'sur', 'pour', 'dans', 'avec', 'plus', 'not', 'that', 'with', 'from', 'this', 'have'}
-        filtered = [w for w in words if w not in ignore]
-        
-        counts = Counter(filtered).most_common(7)
-        if not counts: return None
-        
-        labels, values = zip(*counts)
+        summary = wiki_client.summary(topic, sentences, code, timeout)
+        instrumentation.add_bytes(len(summary.encode("utf-8")))
+        return summary
+    except:
+        return "N/A"
+
+def search_web(topic, web_count):
+    try:
+        with DDGS() as ddgs:
+            return list(ddgs.text(topic, max_results=web_count))
+    except:
+        return []
+
+def fetch_all(topic, code, sentences, web_count, scrape, force_refresh=False, trace=None, budget=None):
+    """Runs Wikipedia, image download, DDGS and the scrapes together.
+    Total time follows the slowest fetch instead of the sum of all of them.
+    Everything goes through the research cache unless force_refresh is set.
+    Every fetch is a span of trace (one per scraped URL).
+    Each stage is waited for only as long as budget allows: late results are
+    left out (web pages fall back to the DDGS snippet) and listed in budget.missing."""
+    summaries, images, web_results = fetch_languages(topic, [code], sentences, web_count, scrape,
+                                                     force_refresh, trace, budget)
+    return summaries[code], images[code], web_results
+
+def fetch_languages(topic, codes, sentences, web_count, scrape, force_refresh=False, trace=None, budget=None):
+    """fetch_all for several languages at once: the Wikipedia summary and image
+    of every language are fetched concurrently, while DDGS and the scraped
+    pages (the same in every language) are fetched only once.
+    Returns ({code: summary}, {code: image bytes or None}, web_results)."""
+    trace = trace or instrumentation.Trace("fetch_all", log_file=None)
+    budget = budget or Budget()
+    cache = research_cache.get_cache()
+    many = len(codes) > 1
+
+    def http_timeout(default):
+        # Never wait on a socket longer than the report has left
+        return max(0.5, min(default, budget.remaining()))
+
+    def timed(name, fn, *args):
+        with trace.span(name):
+            return fn(*args)
+
+    def cached_scrape(url):
+        # A page read while the report was stopping may have been cut short by
+        # budget.stopped (which stays true once set): it is used, never cached.
+        # That includes the scrapes still running after pool.shutdown below
+        with trace.span(f"scrape {urlparse(url).netloc}", url=url):
+            return cache.fetch("scrape", url, lambda: smart_scrape(url, http_timeout(4), budget.stopped),
+                               force=force_refresh, keep=lambda v: v != "Site access failed." and not budget.stopped())
+
+    # Not a with-block: on timeout or cancel we must not wait for hung fetches
+    pool = ThreadPoolExecutor(max_workers=MAX_FETCH_WORKERS + 2 * (len(codes) - 1))
+    try:
+        started = time.monotonic()
+        wiki_futures, img_futures = {}, {}
+        for code in codes:
+            suffix = f" {code}" if many else ""
+            wiki_futures[code] = pool.submit(timed, "wikipedia.summary" + suffix, cache.fetch, "wiki_summary", topic,
+                                             lambda c=code: fetch_summary(topic, sentences, c, http_timeout(5)), code, sentences,
+                                             force_refresh, lambda v: v != "N/A")
+            img_futures[code] = pool.submit(timed, "download_image" + suffix, cache.fetch, "wiki_image", topic,
+                                            lambda c=code: download_image(topic, http_timeout(5), budget.stopped, c),
+                                            code, "", force_refresh)
+        ddgs_future = pool.submit(timed, "ddgs", cache.fetch, "ddgs", topic, lambda: search_web(topic, web_count),
+                                  "", web_count, force_refresh)
+
+        if budget.wait([ddgs_future], budget.stage_left("ddgs", started)):
+            raw = ddgs_future.result()
+        else:
+            raw = []
+            budget.skip("web search")
+
+        if scrape and raw:
+            scrape_started = time.monotonic()
+            futures = [pool.submit(cached_scrape, r['href']) for r in raw]
+            budget.wait(futures, budget.stage_left("scrape", scrape_started))
+            # Same order as the search results; late pages keep the DDGS snippet
+            bodies = [f.result() if f.done() else r['body'] for r, f in zip(raw, futures)]
+            late = sum(1 for f in futures if not f.done())
+            if late: budget.skip(f"{late} web page(s)")
+        else:
+            bodies = [r['body'] for r in raw]
+
+        summaries, images = {}, {}
+        for code in codes:
+            label = f" ({code})" if many else ""
+            if budget.wait([wiki_futures[code]], budget.stage_left("wikipedia", started)):
+                summaries[code] = wiki_futures[code].result()
+            else:
+                summaries[code] = "N/A"
+                budget.skip("Wikipedia summary" + label)
+
+            if budget.wait([img_futures[code]], budget.stage_left("image", started)):
+                images[code] = img_futures[code].result()
+            else:
+                images[code] = None
+                budget.skip("image" + label)
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    web_results = [{'title': r['title'], 'body': body, 'href': r['href']} for r, body in zip(raw, bodies)]
+    return summaries, images, web_results
+
+def create_chart(text_data, topic, lang="it"):
+    try:
+        # Distinctive terms vs past reports (TF-IDF), or plain frequency while the corpus is small
+        mode, top = keywords.analyze(text_data, lang, k=7, corpus=keywords.get_corpus())
+        if not top: return None
         
-        plt.figure(figsize=(6, 4))
-        plt.bar(labels, values, color='#213363')
-        plt.title(f"Keywords: {topic}")
-        plt.xticks(rotation=45)
-        plt.tight_layout()
+        labels, values = zip(*top)
         
-        filename = "temp_chart.png"
-        plt.savefig(filename)
-        plt.close()
-        return filename
+        # Figure + Agg canvas directly: no pyplot, so no GUI backend is ever loaded
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        with CHART_LOCK:
+            fig = Figure(figsize=(6, 4))
+            FigureCanvasAgg(fig)
+            ax = fig.add_subplot()
+            ax.bar(labels, values, color='#213363')
+            ax.set_title(f"{'Distinctive terms' if mode == 'tfidf' else 'Keywords'}: {topic}")
+            ax.tick_params(axis='x', labelrotation=45)
+            fig.tight_layout()
+            
+            buf = io.BytesIO()
+            fig.savefig(buf, format="png")
+        return buf.getvalue()
     except Exception:
         return None
 
-# --- EXPORT LOGIC ---
-def generate_docx(topic, wiki_summary, web_results, img_file, chart_file, save_path):
-    doc = Document()
-    doc.add_heading(f'Report: {topic}', 0)
-    
-    doc.add_paragraph(f"Generated on: {datetime.date.today()}")
-
-    if img_file:
-        try:
-            doc.add_picture(img_file, width=Inches(4))
-        except: pass
-
-    doc.add_heading('General Overview', level=1)
-    doc.add_paragraph(wiki_summary)
-
-    if chart_file:
-        doc.add_heading('Data Analysis', level=1)
-        try:
-            doc.add_picture(chart_file, width=Inches(5))
-        except: pass
-
-    if web_results:
-        doc.add_heading('Web Resources', level=1)
-        for res in web_results:
-            p = doc.add_paragraph()
-            runner = p.add_run(res['title'])
-            runner.bold = True
-            doc.add_paragraph(res['body'])
-            doc.add_paragraph(res['href'], style='Intense Quote')
-
-    doc.save(save_path)
-
-class PDFReport(FPDF):
-    def __init__(self, topic, cover_image=None):
-        super().__init__()
-        self.topic = clean_text(topic)
-        self.cover_image = cover_image
-        self.set_auto_page_break(auto=True, margin=15)
-
-    def header(self):
-        if self.page_no() > 1:
-            self.set_font('Arial', 'I', 8)
-            self.set_text_color(128)
-            self.cell(0, 10, f'Report: {self.topic}', 0, 0, 'R')
-            self.ln(10)
-
-    def footer(self):
-        self.set_y(-15)
-        self.set_font('Arial', 'I', 8)
-        self.set_text_color(128)
-        self.cell(0, 10, f'Page {self.page_no()}', 0, 0, 'C')
-        self.add_page()
-        self.set_y(40)
-        self.set_font('Arial', 'B', 24)
-        self.set_text_color(33, 51, 99)
-        self.cell(0, 20, "REPORT PREMIUM", ln=True, align='C')
-        
-        if self.cover_image:
-            try:
-                self.image(self.cover_image, x=65, y=70, w=80)
-                self.set_y(160)
-            except:
-                self.set_y(100)
-        else:
-            self.set_y(100)
-
-        self.set_font('Arial', 'B', 32)
-        self.set_text_color(0)
-        self.cell(0, 20, self.topic, ln=True, align='C')
-        self.add_page()
-
-    def add_section_title(self, title):
-        self.set_font('Arial', 'B', 14)
-        self.set_text_color(33, 51, 99)
-        self.cell(0, 10, clean_text(title), 0, 1, 'L')
-        self.set_text_color(0)
-        self.ln(2)
-
-    def add_paragraph(self, text):
-        self.set_font('Arial', '', 11)
-        self.multi_cell(0, 6, clean_text(text))
-        self.ln(5)
-
-    def add_web_card(self, title, body, link):
-        self.set_fill_color(240, 240, 240)
-        self.set_font('Arial', 'B', 10)
-        self.cell(0, 8, clean_text(title), 0, 1, 'L', True)
-        self.set_font('Arial', '', 10)
-        self.multi_cell(0, 5, clean_text(body))
-        self.set_font('Arial', 'I', 8)
-        self.set_text_color(0, 0, 255)
-        self.cell(0, 5, clean_text(link), 0, 1)
-        self.set_text_color(0)
-        self.ln(3)
-
-def generate_report(topic, lang, depth, save_path, export_format):
-    lang_map = {"Italiano": "it", "English": "en", "Français": "fr", "Español": "es", "Deutsch": "de"}
-    code = lang_map.get(lang, "it")
+
+def collect_report(topic, lang, depth, force_refresh=False, trace=None, budget=None):
+    """Fetches everything a report needs and returns it as a report_model.Report."""
+    return collect_languages(topic, [lang], depth, force_refresh, trace, budget)[0]
+
+def collect_languages(topic, langs, depth, force_refresh=False, trace=None, budget=None, charts="all"):
+    """collect_report for several languages (LANG_MAP names) with one shared
+    fetch. Returns one Report per language, in order; charts="first" only
+    draws the first language's chart (enough for a combined report)."""
+    codes = [LANG_MAP.get(lang, "it") for lang in langs]
     sentences = 5 if depth == "Fast" else (20 if depth == "In-depth" else 10)
     web_count = 1 if depth == "Fast" else (5 if depth == "In-depth" else 3)
-    
+    trace = trace or instrumentation.Trace(f"collect {topic}", log_file=None)
+    budget = budget or Budget.for_depth(depth)
+
+    with trace.span("fetch"):
+        summaries, images, web_results = fetch_languages(topic, codes, sentences, web_count, scrape=depth != "Fast",
+                                                         force_refresh=force_refresh, trace=trace, budget=budget)
+    reports = [Report(topic, lang, depth, summaries[code], web_results, images[code]) for lang, code in zip(langs, codes)]
+
+    if depth != "Fast":
+        for report, code in list(zip(reports, codes))[:1 if charts == "first" else None]:
+            if budget.remaining() <= 0:
+                budget.skip("chart")
+                break
+            with trace.profiled("create_chart"):
+                report.chart_data = create_chart(report.full_text, topic, code)
+    for report in reports:
+        report.missing = list(budget.missing)
+    return reports
+
+def save_report(report, save_path, export_format, trace, prof_file=None, record=True):
+    """Saves the model, exports it and records it in history and the search index.
+    record=False (re-exports) only exports: the report is already recorded."""
+    with trace.span("model"):
+        data_path = report.save()
+    ext = report_model.extension(export_format).lstrip(".")
+    with trace.profiled(f"export.{ext}", prof_file):
+        report.export(save_path, export_format)
+    if not record:
+        return
+    with trace.span("history"):
+        save_to_history(report.topic, save_path, report.lang, report.depth, export_format, data_path)
+    with trace.span("index"):
+        index_report(report.topic, " ".join(summary for _, summary in report.summaries), report.web_results,
+                     save_path, report.lang, report.depth, export_format)
+
+def generate_report(topic, lang, depth, save_path, export_format, force_refresh=False, progress=None, profile=False,
+                    budget=None, shared=None):
+    """progress(event, span, active, done) is called as stages start/end.
+    profile=True runs cProfile over chart and export and saves <report>.prof.
+    budget (default: the deadline for this depth) bounds the fetch time; call
+    budget.cancel() from another thread to stop with ReportCancelled.
+    shared (job_queue.SharedFetch) lets reports that differ only in format
+    fetch once: the first one collects, the others reuse its Report."""
     print(f"Working on {topic} ({export_format})...")
-    
-    try:
-        wikipedia.set_lang(code)
-        wiki_summary = wikipedia.summary(topic, sentences=sentences)
-        img_file = download_image(topic)
-    except:
-        wiki_summary = "N/A"
-        img_file = None
+    trace = instrumentation.Trace(f"report {topic}", on_event=progress, profile=profile,
+                                  topic=topic, lang=lang, depth=depth, format=export_format, path=save_path)
+    prof_file = instrumentation.profile_path(save_path) if profile else None
+    budget = budget or Budget.for_depth(depth)
 
-    web_results = []
-    full_text = wiki_summary
     try:
-        with DDGS() as ddgs:
-            raw = list(ddgs.text(topic, max_results=web_count))
-            for r in raw:
-                body = smart_scrape(r['href']) if depth != "Fast" else r['body']
-                web_results.append({'title': r['title'], 'body': body, 'href': r['href']})
-                full_text += " " + body
-    except: pass
-
-    chart_file = create_chart(full_text, topic) if depth != "Fast" else None
-
-    # Export
-    if "PDF" in export_format:
-        pdf = PDFReport(topic, img_file)
-        pdf.create_cover_page()
-        pdf.add_section_title(f"Overview ({lang})")
-        pdf.add_paragraph(wiki_summary)
-        pdf.ln()
-        if chart_file:
-            pdf.add_section_title("Semantic Analysis")
-            pdf.image(chart_file, x=50, w=110)
-            pdf.ln(10)
-        if web_results:
-            pdf.add_section_title("Web Resources")
-            for res in web_results:
-                pdf.add_web_card(res['title'], res['body'], res['href'])
-        pdf.output(save_path)
-    
-    elif "Word" in export_format:
-        generate_docx(topic, wiki_summary, web_results, img_file, chart_file, save_path)
-
-    # Cleanup & History
-    if img_file and os.path.exists(img_file): os.remove(img_file)
-    if chart_file and os.path.exists(chart_file): os.remove(chart_file)
-    
-    save_to_history(topic, save_path)
+        report = None
+        if shared is not None and not shared.claim():
+            # The job that claimed it is bounded by its own deadline
+            with trace.span("fetch (shared)"):
+                budget.wait([shared.future], float("inf"))
+            if shared.future.exception() is None:
+                report = shared.future.result()
+                budget.missing.extend(report.missing)
+            shared = None  # That job was cancelled or failed: fetch on our own
+        if report is None:
+            try:
+                report = collect_report(topic, lang, depth, force_refresh, trace, budget)
+            except BaseException as e:
+                if shared is not None: shared.future.set_exception(e)
+                raise
+            if shared is not None: shared.future.set_result(report)
+        budget.check()
+        save_report(report, save_path, export_format, trace, prof_file)
+    except ReportCancelled:
+        trace.finish("cancelled")
+        raise
+    except Exception as e:
+        trace.finish("failed", error=str(e))
+        raise
+
+    trace.finish("partial" if budget.missing else "ok", missing=budget.missing,
+                 http=http_client.stats(), cache=research_cache.get_cache().stats())
+    print(trace.summary())
     return save_path
 
-# --- GUI ---
-class UltimateApp(ctk.CTk):
-    def __init__(self):
-        super().__init__()
-        self.title("Research Station Premium")
-        self.geometry("800x650")
-        ctk.set_appearance_mode("Dark")
-        ctk.set_default_color_theme("blue") 
-
-        # Tabs
-        self.tabview = ctk.CTkTabview(self, width=780, height=600)
-        self.tabview.pack(pady=10)
-        self.tabview.add("Search")
-        self.tabview.add("History")
-        self.tabview.add("Settings")
-        
-        self.setup_search_tab()
-        self.setup_history_tab()
-        self.setup_settings_tab()
+def generate_multilang_report(topic, langs, depth, save_path, export_format, combined=True, force_refresh=False,
+                              progress=None, profile=False, budget=None):
+    """Same topic in several languages (LANG_MAP names) for about the time of one:
+    DDGS and the scraped pages are fetched once, every language's summary and
+    image at the same time. combined=True writes one report with a section per
+    language to save_path, otherwise "<name> (<language>)<ext>" per language.
+    Returns the written paths."""
+    print(f"Working on {topic} in {', '.join(langs)} ({export_format})...")
+    trace = instrumentation.Trace(f"report {topic}", on_event=progress, profile=profile, topic=topic,
+                                  lang=" + ".join(langs), depth=depth, format=export_format, path=save_path)
+    budget = budget or Budget.for_depth(depth)
 
-    def setup_search_tab(self):
-        tab = self.tabview.tab("Search")
-        
-        ctk.CTkLabel(tab, text="Research Station", font=("Arial", 28, "bold"), text_color="#4B8BBE").pack(pady=15)
-        
-        self.entry = ctk.CTkEntry(tab, placeholder_text="Topic...", width=500, height=45, font=("Arial", 14))
-        self.entry.pack(pady=10)
-
-        frame = ctk.CTkFrame(tab, fg_color="transparent")
-        frame.pack(pady=5)
-        
-        ctk.CTkLabel(frame, text="Language:").grid(row=0, column=0, padx=5)
-        self.opt_lang = ctk.CTkOptionMenu(frame, values=["Italiano", "English", "Français", "Deutsch"])
-        self.opt_lang.grid(row=0, column=1, padx=10)
-        
-        ctk.CTkLabel(frame, text="Depth:").grid(row=0, column=2, padx=5)
-        self.seg_depth = ctk.CTkSegmentedButton(frame, values=["Fast", "Normal", "In-depth"])
-        self.seg_depth.set("Normal")
-        self.seg_depth.grid(row=0, column=3, padx=10)
-
-        ctk.CTkLabel(frame, text="Format:").grid(row=1, column=0, padx=5, pady=10)
-        self.opt_format = ctk.CTkOptionMenu(frame, values=["PDF", "Word (.docx)"])
-        self.opt_format.grid(row=1, column=1, padx=10, pady=10)
-
-        self.btn_go = ctk.CTkButton(tab, text="START SEARCH", width=250, height=50, font=("Arial", 16, "bold"), command=self.ask_save)
-        self.btn_go.pack(pady=20)
-
-        self.progress = ctk.CTkProgressBar(tab, width=500, mode="indeterminate")
-        self.progress.pack_forget()
-        self.status = ctk.CTkLabel(tab, text="Ready.", text_color="gray")
-        self.status.pack(pady=5)
-        
-        self.btn_open = ctk.CTkButton(tab, text="OPEN FILE", fg_color="#E09F3E", state="disabled", command=self.open_current)
-        self.btn_open.pack_forget()
-        self.saved_path = None
-
-    def setup_history_tab(self):
-        tab = self.tabview.tab("History")
-        self.history_frame = ctk.CTkScrollableFrame(tab, width=700, height=450)
-        self.history_frame.pack(pady=10)
-        self.refresh_history()
-        
-        ctk.CTkButton(tab, text="Refresh List", command=self.refresh_history).pack(pady=5)
-
-    def refresh_history(self):
-        for w in self.history_frame.winfo_children(): w.destroy()
-        hist = load_history()
-        if not hist:
-            ctk.CTkLabel(self.history_frame, text="No recent searches.").pack(pady=20)
-            return
-            
-        for h in hist:
-            f = ctk.CTkFrame(self.history_frame)
-            f.pack(fill="x", pady=2, padx=5)
-            ctk.CTkLabel(f, text=f"[{h['date']}] {h['topic']}", anchor="w", width=300).pack(side="left", padx=10)
-            ctk.CTkButton(f, text="Open", width=80, command=lambda p=h['path']: self.safe_open(p)).pack(side="right", padx=10)
-
-    def safe_open(self, path):
-        if os.path.exists(path):
-            os.startfile(path)
+    try:
+        reports = collect_languages(topic, langs, depth, force_refresh, trace, budget,
+                                    charts="first" if combined else "all")
+        budget.check()
+        if combined:
+            targets = [(report_model.combine(reports), save_path)]
         else:
-            msgbox.showerror("Error", "The file no longer exists.")
-
-    def setup_settings_tab(self):
-        tab = self.tabview.tab("Settings")
-        ctk.CTkLabel(tab, text="App Theme", font=("Arial", 18)).pack(pady=20)
-        self.seg_theme = ctk.CTkSegmentedButton(tab, values=["Blue", "Green", "Dark-Blue"], command=self.change_theme)
-        self.seg_theme.set("Blue")
-        self.seg_theme.pack(pady=10)
-        ctk.CTkLabel(tab, text="(Requires restart to fully apply to all elements)", text_color="gray").pack()
-
-    def change_theme(self, value):
-        ctk.set_default_color_theme(value.lower())
-        msgbox.showinfo("Theme", f"You selected {value}. Restart the app to see all changes.")
-
-    def ask_save(self):
-        topic = self.entry.get().strip()
-        fmt = self.opt_format.get()
-        ext = ".pdf" if "PDF" in fmt else ".docx"
-        
-        path = filedialog.asksaveasfilename(defaultextension=ext, title="Save Report", initialfile=f"{topic}{ext}")
-        if path:
-            self.toggle_ui(False)
-            self.progress.pack()
-            self.progress.start()
-            threading.Thread(target=self.worker, args=(topic, self.opt_lang.get(), self.seg_depth.get(), path, fmt)).start()
-
-    def worker(self, topic, lang, depth, path, fmt):
-        try:
-            generate_report(topic, lang, depth, path, fmt)
-            self.saved_path = path
-            self.on_success()
-        except Exception as e:
-            print(e)
-            self.on_fail(str(e))
-
-    def on_success(self):
-        self.progress.stop()
-        self.progress.pack_forget()
-        self.status.configure(text="Completed!", text_color="green")
-        self.btn_open.pack(pady=10)
-        self.btn_open.configure(state="normal")
-        self.toggle_ui(True)
-        self.refresh_history()
-
-    def on_fail(self, err):
-        self.progress.stop()
-        self.progress.pack_forget()
-        self.status.configure(text=f"Error: {err}", text_color="red")
-        self.toggle_ui(True)
-        
-    def toggle_ui(self, enable):
-        state = "normal" if enable else "disabled"
-        self.btn_go.configure(state=state)
-        
-    def open_current(self):
-        if self.saved_path: os.startfile(self.saved_path)
+            base, ext = os.path.splitext(save_path)
+            targets = [(report, f"{base} ({report.lang}){ext}") for report in reports]
+        for report, path in targets:
+            save_report(report, path, export_format, trace, instrumentation.profile_path(path) if profile else None)
+    except ReportCancelled:
+        trace.finish("cancelled")
+        raise
+    except Exception as e:
+        trace.finish("failed", error=str(e))
+        raise
+
+    trace.finish("partial" if budget.missing else "ok", missing=budget.missing,
+                 http=http_client.stats(), cache=research_cache.get_cache().stats())
+    print(trace.summary())
+    return [path for _, path in targets]
+
+def reexport_report(data_path, save_path, export_format=None, progress=None):
+    """Exports a saved report model again (any registered format), without network I/O."""
+    report = Report.load(data_path)
+    export_format = export_format or report_model.format_for_path(save_path)
+    trace = instrumentation.Trace(f"reexport {report.topic}", on_event=progress, topic=report.topic,
+                                  lang=report.lang, depth=report.depth, format=export_format, path=save_path)
+    try:
+        save_report(report, save_path, export_format, trace, record=False)
+    except Exception as e:
+        trace.finish("failed", error=str(e))
+        raise
+    trace.finish("ok")
+    return save_path
 
-if __name__ == "__main__":
+def main():
+    # Run as a script: gui.py's `import SearchEngine` must get this module, not a second copy
+    sys.modules.setdefault("SearchEngine", sys.modules[__name__])
+    from gui import UltimateApp
     app = UltimateApp()
     app.mainloop()
+    app.job_queue.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Headless batch mode for the Research Station.
+Reads topics from a file (or stdin), one per line:
+
+    topic | language | depth | format
+
+Only the topic is required; missing fields use the command-line defaults.
+Lines starting with '#' are ignored. Reports are generated across a pool
+of worker processes (PDF/DOCX rendering and charts are CPU-bound and hold
+the GIL, so threads would not scale) and a JSON manifest is written with
+the status and timing of every topic.
+
+Example:
+    python batch_report.py topics.txt --out-dir reports --workers 4
+    type topics.txt | python batch_report.py - --format docx
+"""
+
+import argparse
+import datetime
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# Charts are only ever saved to file here, never shown
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+DEPTHS = {"fast": "Fast", "normal": "Normal", "in-depth": "In-depth", "indepth": "In-depth"}
+FORMATS = {"pdf": "PDF", "docx": "Word (.docx)", "word": "Word (.docx)", "html": "HTML (.html)"}
+EXTENSIONS = {"PDF": ".pdf", "Word (.docx)": ".docx", "HTML (.html)": ".html"}
+
+
+def parse_language(value):
+    from SearchEngine import LANG_MAP
+    value = value.strip()
+    for name, code in LANG_MAP.items():
+        if value.lower() in (name.lower(), code):
+            return name
+    raise ValueError(f"Unknown language: {value}")
+
+
+def parse_depth(value):
+    try:
+        return DEPTHS[value.strip().lower()]
+    except KeyError:
+        raise ValueError(f"Unknown depth: {value}")
+
+
+def parse_format(value):
+    try:
+        return FORMATS[value.strip().lower()]
+    except KeyError:
+        raise ValueError(f"Unknown format: {value}")
+
+
+def safe_filename(topic):
+    name = "".join(c if c.isalnum() or c in " -_" else "_" for c in topic).strip()
+    return name or "report"
+
+
+def read_jobs(lines, defaults, out_dir):
+    jobs = []
+    used = set()
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        fields = [f.strip() for f in line.split("|")]
+        fields += [""] * (4 - len(fields))
+        topic, lang, depth, fmt = fields[:4]
+        if not topic:
+            print(f"Line {number}: no topic, skipped.", file=sys.stderr)
+            continue
+        try:
+            job = {
+                "topic": topic,
+                "lang": parse_language(lang) if lang else defaults["lang"],
+                "depth": parse_depth(depth) if depth else defaults["depth"],
+                "format": parse_format(fmt) if fmt else defaults["format"],
+            }
+        except ValueError as e:
+            raise SystemExit(f"Line {number}: {e}")
+        base = safe_filename(topic)
+        if job["lang"] != defaults["lang"]:
+            base += f" ({job['lang']})"
+        path, n = base, 1
+        while path.lower() + job["format"] in used:
+            n += 1
+            path = f"{base} {n}"
+        used.add(path.lower() + job["format"])
+        job["path"] = os.path.join(out_dir, path + EXTENSIONS[job["format"]])
+        jobs.append(job)
+    return jobs
+
+
+def run_job(job, force_refresh=False):
+    # Runs inside a worker process
+    from SearchEngine import generate_report
+    start = time.perf_counter()
+    result = dict(job)
+    try:
+        generate_report(job["topic"], job["lang"], job["depth"], job["path"], job["format"], force_refresh)
+        result["status"] = "ok"
+    except Exception as e:
+        result["status"] = "failed"
+        result["error"] = str(e)
+    result["seconds"] = round(time.perf_counter() - start, 3)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate many research reports without the GUI.")
+    parser.add_argument("topics", help="File with one topic per line, or '-' for stdin")
+    parser.add_argument("--out-dir", default="reports", help="Where reports are written (default: reports)")
+    parser.add_argument("--lang", default="Italiano", help="Default language (name or code, e.g. English / en)")
+    parser.add_argument("--depth", default="Normal", help="Default depth: Fast, Normal, In-depth")
+    parser.add_argument("--format", default="pdf", help="Default format: pdf, docx or html")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument("--manifest", default=None, help="Manifest path (default: <out-dir>/manifest.json)")
+    parser.add_argument("--force-refresh", action="store_true", help="Ignore the research cache")
+    args = parser.parse_args(argv)
+
+    defaults = {"lang": parse_language(args.lang), "depth": parse_depth(args.depth), "format": parse_format(args.format)}
+
+    if args.topics == "-":
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(args.topics, encoding="utf-8") as f:
+            lines = f.read().splitlines()
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    jobs = read_jobs(lines, defaults, args.out_dir)
+    if not jobs:
+        print("No topics to process.")
+        return 0
+
+    print(f"Generating {len(jobs)} reports with {args.workers} workers...")
+    start = time.perf_counter()
+    results = [None] * len(jobs)
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = {pool.submit(run_job, job, args.force_refresh): i for i, job in enumerate(jobs)}
+        for future in as_completed(futures):
+            i = futures[future]
+            try:
+                results[i] = future.result()
+            except Exception as e:
+                # The worker process itself died
+                results[i] = dict(jobs[i], status="failed", error=str(e), seconds=None)
+            r = results[i]
+            print(f"[{r['status'].upper()}] {r['topic']} ({r['seconds']}s)")
+
+    manifest = {
+        "created": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "workers": args.workers,
+        "total_seconds": round(time.perf_counter() - start, 3),
+        "ok": sum(1 for r in results if r["status"] == "ok"),
+        "failed": sum(1 for r in results if r["status"] != "ok"),
+        "reports": results,
+    }
+    manifest_path = args.manifest or os.path.join(args.out_dir, "manifest.json")
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=4, ensure_ascii=False)
+    print(f"Manifest written to {manifest_path}")
+    return 0 if manifest["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
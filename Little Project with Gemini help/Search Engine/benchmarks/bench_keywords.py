@@ -0,0 +1,72 @@
+"""
+Benchmark: keyword extraction on large texts.
+Compares the old create_chart logic (regex + per-token stopword filter +
+Counter.most_common) with the keywords engine, in frequency and TF-IDF mode.
+
+    python benchmarks/bench_keywords.py [--mb 1 5 20] [--repeat 3]
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import keywords  # noqa: E402
+
+
+def legacy_top(text_data):
+    # Copy of the original create_chart analysis
+    words = re.findall(r'\b\w{5,}\b', text_data.lower())
+    ignore = {'anche', 'della', 'delle', 'nella', 'hanno', 'stato', 'sono', 'come', 'questo', 'questa', 'degli', 'parte', 'prima', 'dopo', 'tutto', 'tutti', 'fatto', 'essere', 'avere', 'which', 'their', 'about', 'would', 'these', 'other', 'sur', 'pour', 'dans', 'avec', 'plus', 'not', 'that', 'with', 'from', 'this', 'have'}
+    filtered = [w for w in words if w not in ignore]
+    return Counter(filtered).most_common(7)
+
+
+def make_text(size_mb, seed=42):
+    rng = random.Random(seed)
+    vocab = ["".join(rng.choice("abcdefghilmnoprstuvz") for _ in range(rng.randint(3, 12))) for _ in range(20000)]
+    vocab += sorted(keywords.STOPWORDS["it"]) * 20 + sorted(keywords.STOPWORDS["en"]) * 20
+    out, size = [], 0
+    while size < size_mb * 1024 * 1024:
+        sentence = " ".join(rng.choice(vocab) for _ in range(15)) + ". "
+        out.append(sentence)
+        size += len(sentence)
+    return "".join(out)
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mb", type=float, nargs="+", default=[1, 5, 20])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = keywords.KeywordCorpus(os.path.join(tmp, "corpus.sqlite"))
+        for i in range(keywords.MIN_CORPUS_DOCS):
+            corpus.add(keywords.term_counts(make_text(0.2, seed=i), "it"), "it", f"doc{i}")
+
+        print(f"{'size':>8} {'legacy':>10} {'frequency':>10} {'tfidf':>10} {'speedup':>8}")
+        for mb in args.mb:
+            text = make_text(mb)
+            legacy = timed(lambda: legacy_top(text), args.repeat)
+            freq = timed(lambda: keywords.top_terms(text, "it"), args.repeat)
+            tfidf = timed(lambda: keywords.analyze(text, "it", corpus=corpus, learn=False), args.repeat)
+            print(f"{mb:>6.1f}MB {legacy * 1000:>8.1f}ms {freq * 1000:>8.1f}ms {tfidf * 1000:>8.1f}ms {legacy / freq:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
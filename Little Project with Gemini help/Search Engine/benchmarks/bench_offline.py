@@ -0,0 +1,316 @@
+"""
+Offline end-to-end benchmark for generate_report.
+A local stand-in HTTP server plays Wikipedia, DuckDuckGo and the scraped
+websites, with configurable latency, payload size and failure rate.
+wiki_client is pointed at the stand-in's copy of the Wikipedia API and
+`DDGS` in SearchEngine is swapped for a thin client of it; smart_scrape and
+download_image run unchanged against the URLs it hands out. Every depth (Fast, Normal, In-depth) is run in both PDF and
+Word, and end-to-end / per-stage latency and throughput are reported from
+the report_timings.jsonl spans.
+
+    python benchmarks/bench_offline.py --runs 5 --latency 80 --fail-rate 0.05
+    python benchmarks/bench_offline.py --save-baseline        # store results
+    python benchmarks/bench_offline.py --compare              # flag regressions
+
+Everything (cache, history, index, logs, reports) is written to a temporary
+directory, deleted at the end unless --keep is given, and the research cache
+is bypassed, so runs are reproducible.
+"""
+
+import argparse
+import io
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+DEFAULT_BASELINE = os.path.join(HERE, "baselines", "offline.json")
+DEPTHS = ["Fast", "Normal", "In-depth"]
+FORMATS = ["PDF", "Word (.docx)"]
+LOREM = ("Lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor incididunt "
+         "labore dolore magna aliqua enim minim veniam quis nostrud exercitation ullamco laboris ").split()
+
+
+# --- STAND-IN SERVER ---
+class StandInConfig:
+    def __init__(self, latency_ms=50, jitter_ms=20, fail_rate=0.0, page_kb=200, image_px=1600, seed=1):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.fail_rate = fail_rate
+        self.page_kb = page_kb
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.page = self._make_page(page_kb)
+        self.image = self._make_image(image_px)
+
+    def _make_page(self, kb):
+        rng = random.Random(2)
+        parts, size = ["<html><head><title>Stand-in</title></head><body>"], 0
+        while size < kb * 1024:
+            p = "<p>" + " ".join(rng.choice(LOREM) for _ in range(60)) + "</p>\n"
+            parts.append(p)
+            size += len(p)
+        parts.append("</body></html>")
+        return "".join(parts).encode("utf-8")
+
+    def _make_image(self, px):
+        from PIL import Image
+        # Noise compresses badly, like a big photo would
+        img = Image.frombytes("RGB", (px, px * 3 // 4), os.urandom(px * (px * 3 // 4) * 3))
+        out = io.BytesIO()
+        img.save(out, format="JPEG", quality=90)
+        return out.getvalue()
+
+    def wait_and_roll(self):
+        with self.lock:
+            self.requests += 1
+            delay = max(0.0, self.latency_ms + self.rng.uniform(-self.jitter_ms, self.jitter_ms)) / 1000
+            fail = self.rng.random() < self.fail_rate
+        time.sleep(delay)
+        return fail
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, like the real sites
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body, content_type):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        cfg = self.server.config
+        url = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        if cfg.wait_and_roll():
+            return self._send(503, b"stand-in failure", "text/plain")
+
+        if url.path.endswith("/w/api.php"):  # /<lang>/w/api.php, the part of the API wiki_client uses
+            base = f"http://{self.headers['Host']}"
+            if query.get("generator") == "images":
+                pages = [{"title": f"File:{i}.jpg", "imageinfo": [{"url": f"{base}/image/{i}.jpg"}]} for i in range(3)]
+            else:
+                topic = query.get("gsrsearch", "")
+                page = {"title": topic}
+                if "extracts" in query.get("prop", ""):
+                    n = int(query.get("exsentences", 10))
+                    page["extract"] = " ".join(f"{topic} " + " ".join(LOREM[i % 7:i % 7 + 12]) + "." for i in range(n))
+                pages = [page]
+            body = json.dumps({"query": {"pages": pages}})
+            return self._send(200, body.encode("utf-8"), "application/json")
+        if url.path == "/ddgs":
+            base = f"http://{self.headers['Host']}"
+            n = int(query.get("max_results", 5))
+            results = [{"title": f"Result {i} for {query.get('topic', '')}", "href": f"{base}/page/{i}",
+                        "body": " ".join(LOREM[:20])} for i in range(n)]
+            return self._send(200, json.dumps(results).encode("utf-8"), "application/json")
+        if url.path.startswith("/page/"):
+            return self._send(200, cfg.page, "text/html; charset=utf-8")
+        if url.path.startswith("/image/"):
+            return self._send(200, cfg.image, "image/jpeg")
+        return self._send(404, b"not found", "text/plain")
+
+
+def start_server(config):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    server.daemon_threads = True
+    server.config = config
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# --- STAND-IN CLIENTS ---
+def stand_in_ddgs(base):
+    class StandInDDGS:
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def text(self, topic, max_results=5):
+            import http_client
+            r = http_client.get(base + "/ddgs", params={"topic": topic, "max_results": max_results}, timeout=5)
+            if r.status_code != 200:
+                raise Exception(f"stand-in ddgs: HTTP {r.status_code}")
+            return r.json()
+    return StandInDDGS
+
+
+# --- RUN ---
+def percentile(values, q):
+    values = sorted(values)
+    if not values:
+        return 0.0
+    k = (len(values) - 1) * q
+    lo, hi = int(k), min(int(k) + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (k - lo)
+
+
+def stage_of(span_name):
+    # One row for all scraped URLs
+    return "scrape" if span_name.startswith("scrape ") else span_name
+
+
+def run_suite(engine, runs, depths, formats, out_dir):
+    import instrumentation
+    results = {}
+    for depth in depths:
+        for fmt in formats:
+            totals, stages, nbytes = [], {}, []
+            failures = 0
+            start = time.perf_counter()
+            for i in range(runs):
+                ext = ".pdf" if "PDF" in fmt else ".docx"
+                path = os.path.join(out_dir, f"bench_{depth}_{i}{ext}")
+                try:
+                    engine.generate_report(f"Topic {i}", "English", depth, path, fmt, force_refresh=True)
+                except Exception as e:
+                    failures += 1
+                    print(f"  {depth}/{fmt} run {i} failed: {e}")
+                with open(instrumentation.LOG_FILE, "r", encoding="utf-8") as f:
+                    record = json.loads(f.readlines()[-1])
+                totals.append(record["total_s"])
+                nbytes.append(record["bytes"])
+                per_stage = {}
+                for span in record["spans"]:
+                    name = stage_of(span["name"])
+                    per_stage.setdefault(name, []).append(span["duration_s"])
+                for name, durations in per_stage.items():
+                    # Scrapes run in parallel: the slowest one is what the report waits for
+                    stages.setdefault(name, []).append(max(durations))
+            wall = time.perf_counter() - start
+            results[f"{depth} / {fmt}"] = {
+                "runs": runs,
+                "failures": failures,
+                "p50_s": round(percentile(totals, 0.5), 4),
+                "p95_s": round(percentile(totals, 0.95), 4),
+                "mean_s": round(statistics.mean(totals), 4),
+                "reports_per_s": round(runs / wall, 3),
+                "mean_bytes": int(statistics.mean(nbytes)),
+                "stages_mean_s": {k: round(statistics.mean(v), 4) for k, v in sorted(stages.items())},
+            }
+    return results
+
+
+def print_results(results):
+    print(f"\n{'config':<24} {'p50':>8} {'p95':>8} {'rep/s':>7} {'KB':>8}  slowest stages")
+    for name, r in results.items():
+        top = sorted(r["stages_mean_s"].items(), key=lambda kv: kv[1], reverse=True)
+        top = [kv for kv in top if kv[0] != "fetch"][:3]
+        stages = ", ".join(f"{k} {v * 1000:.0f}ms" for k, v in top)
+        print(f"{name:<24} {r['p50_s'] * 1000:>6.0f}ms {r['p95_s'] * 1000:>6.0f}ms {r['reports_per_s']:>7.2f} "
+              f"{r['mean_bytes'] / 1024:>8.0f}  {stages}")
+
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for name, r in results.items():
+        base = baseline.get("results", {}).get(name)
+        if not base:
+            continue
+        for key in ("p50_s", "p95_s"):
+            if base[key] and r[key] > base[key] * (1 + tolerance):
+                regressions.append(f"{name} {key}: {base[key]:.3f}s -> {r[key]:.3f}s")
+        for stage, value in r["stages_mean_s"].items():
+            old = base.get("stages_mean_s", {}).get(stage)
+            # Ignore sub-10ms stages: they are pure noise
+            if old and old > 0.01 and value > old * (1 + tolerance):
+                regressions.append(f"{name} stage {stage}: {old:.3f}s -> {value:.3f}s")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline end-to-end benchmark for generate_report.")
+    parser.add_argument("--runs", type=int, default=5, help="Reports per depth/format")
+    parser.add_argument("--latency", type=float, default=50, help="Stand-in latency per request (ms)")
+    parser.add_argument("--jitter", type=float, default=20, help="Latency jitter (+/- ms)")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Share of requests answered with 503")
+    parser.add_argument("--page-kb", type=int, default=200, help="Size of each scraped page (KB)")
+    parser.add_argument("--image-px", type=int, default=1600, help="Width of the stand-in Wikipedia image")
+    parser.add_argument("--depth", nargs="+", default=DEPTHS, choices=DEPTHS)
+    parser.add_argument("--format", nargs="+", default=["pdf", "docx"], choices=["pdf", "docx"])
+    parser.add_argument("--save-baseline", nargs="?", const=DEFAULT_BASELINE, default=None, metavar="PATH")
+    parser.add_argument("--compare", nargs="?", const=DEFAULT_BASELINE, default=None, metavar="PATH")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown before flagging (0.2 = 20%%)")
+    parser.add_argument("--keep", action="store_true", help="Keep the work dir (reports, logs) after the run")
+    args = parser.parse_args()
+
+    formats = [FORMATS[0] if f == "pdf" else FORMATS[1] for f in args.format]
+    config = StandInConfig(args.latency, args.jitter, args.fail_rate, args.page_kb, args.image_px)
+    server = start_server(config)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    for name in ("save_baseline", "compare"):
+        if getattr(args, name):
+            setattr(args, name, os.path.abspath(getattr(args, name)))
+    cwd = os.getcwd()
+    workdir = tempfile.mkdtemp(prefix="bench_offline_")
+    os.chdir(workdir)  # Cache, history, index and logs all live in the cwd
+    try:
+        import SearchEngine as engine
+        import wiki_client
+        wiki_client.API_URL = base + "/{code}/w/api.php"
+        engine.DDGS = stand_in_ddgs(base)
+
+        print(f"Stand-in at {base}, latency {args.latency}±{args.jitter}ms, fail rate {args.fail_rate}, "
+              f"page {args.page_kb}KB, image {len(config.image) // 1024}KB. Work dir: {workdir}")
+        results = run_suite(engine, args.runs, args.depth, formats, workdir)
+        print_results(results)
+        print(f"\nStand-in served {config.requests} requests")
+    finally:
+        server.shutdown()
+        os.chdir(cwd)
+        if args.keep:
+            print(f"Work dir kept: {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    record = {
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "settings": {k: v for k, v in vars(args).items() if k not in ("save_baseline", "compare", "keep")},
+        "results": results,
+    }
+    status = 0
+    if args.compare:
+        try:
+            with open(args.compare, "r", encoding="utf-8") as f:
+                baseline = json.load(f)
+        except OSError:
+            print(f"No baseline at {args.compare}")
+        else:
+            if baseline.get("settings") != record["settings"]:
+                print("Warning: baseline was recorded with different settings")
+            regressions = compare(results, baseline, args.tolerance)
+            for line in regressions:
+                print(f"REGRESSION {line}")
+            if not regressions:
+                print("No regressions against the baseline.")
+            status = 1 if regressions else 0
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save_baseline)), exist_ok=True)
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(record, f, indent=4)
+        print(f"Baseline saved to {args.save_baseline}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
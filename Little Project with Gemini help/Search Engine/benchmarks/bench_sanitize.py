@@ -0,0 +1,84 @@
+"""
+Micro-benchmark: text sanitization for the PDF exporter.
+Compares the old clean_text (one str.replace per table entry, ~20 passes)
+with sanitize.clean_text (one latin-1 encode plus a byte translate) on
+multi-megabyte inputs, and checks that both give the same output where the
+old table applies. Short titles are timed with and without the memo, so
+the two gains can be told apart.
+
+    python benchmarks/bench_sanitize.py [--mb 1 4 16] [--repeat 3]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import sanitize  # noqa: E402
+
+
+def legacy_clean_text(text):
+    # Copy of the original clean_text
+    if not text: return ""
+    replacements = {
+        '€': 'EUR', '”': '"', '“': '"', '’': "'", '‘': "'", '–': '-', '…': '...',
+        'à': 'a', 'è': 'e', 'é': 'e', 'ì': 'i', 'ò': 'o', 'ù': 'u',
+        'Á': 'A', 'É': 'E', 'Í': 'I', 'Ó': 'O', 'Ú': 'U',
+        'ä': 'a', 'ö': 'o', 'ü': 'u', 'ß': 'ss', 'ñ': 'n'
+    }
+    for k, v in replacements.items():
+        text = text.replace(k, v)
+    return text.encode('latin-1', 'replace').decode('latin-1')
+
+
+def make_text(size_mb, seed=7):
+    # Mostly plain words with the accents and typography of real web text
+    rng = random.Random(seed)
+    words = ["".join(rng.choice("abcdefghilmnoprstuvz") for _ in range(rng.randint(2, 10))) for _ in range(5000)]
+    words += ["città", "perché", "può", "è", "“citazione”", "l’acqua", "Über", "Straße", "…", "—", "ā", "€"] * 10
+    out, size = [], 0
+    while size < size_mb * 1024 * 1024:
+        word = rng.choice(words)
+        out.append(word)
+        size += len(word) + 1
+    return " ".join(out)
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mb", type=float, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'size':>8} {'legacy':>10} {'single-pass':>12} {'MB/s':>8} {'speedup':>8} {'same':>5}")
+    for mb in args.mb:
+        text = make_text(mb)
+        # New table entries and the NFKD fallback are expected to differ
+        plain = text.replace("—", "").replace("ā", "")
+        same = legacy_clean_text(plain) == sanitize.clean_text(plain)
+        legacy = timed(lambda: legacy_clean_text(text), args.repeat)
+        single = timed(lambda: sanitize.clean_text(text), args.repeat)
+        print(f"{mb:>6.1f}MB {legacy * 1000:>8.1f}ms {single * 1000:>10.1f}ms {mb / single:>8.1f} {legacy / single:>7.2f}x {str(same):>5}")
+
+    # Repeated short strings (titles, links): the single pass alone, then with the memo
+    titles = [f"Titolo numero {i % 50} – “citazione”" for i in range(200000)]
+    legacy = timed(lambda: [legacy_clean_text(t) for t in titles], args.repeat)
+    unmemoized = timed(lambda: [sanitize._clean(t) for t in titles], args.repeat)
+    single = timed(lambda: [sanitize.clean_text(t) for t in titles], args.repeat)
+    print(f"200k short titles: legacy {legacy * 1000:.1f}ms, single pass {unmemoized * 1000:.1f}ms "
+          f"({legacy / unmemoized:.2f}x), memoized {single * 1000:.1f}ms ({legacy / single:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
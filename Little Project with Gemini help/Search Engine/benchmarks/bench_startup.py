@@ -0,0 +1,135 @@
+"""
+Startup benchmark for the Research Station.
+Every measurement runs in a fresh interpreter, so nothing is already
+imported or cached in memory:
+- import: time to `import SearchEngine` (what batch_report and other
+  headless users pay), and which heavy modules that import pulled in
+- first window: time from the start of that import until the main window
+  is mapped
+Both are timed inside the child, so they leave out interpreter start; the
+"with interpreter start" figure is the child's whole run, timed from here.
+- deps: what each heavy dependency costs on its own, i.e. what importing
+  them eagerly at module load would add
+
+    python benchmarks/bench_startup.py --runs 10
+    python benchmarks/bench_startup.py --skip-window       # headless machines
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ENGINE_DIR = os.path.dirname(HERE)
+
+HEAVY = ["duckduckgo_search", "fpdf", "docx", "PIL", "matplotlib", "matplotlib.pyplot",
+         "customtkinter", "requests"]
+
+IMPORT_SCRIPT = """
+import json, sys, time
+t = time.perf_counter()
+import SearchEngine
+elapsed = time.perf_counter() - t
+print(json.dumps({"seconds": elapsed, "loaded": [m for m in HEAVY if m in sys.modules]}))
+"""
+
+WINDOW_SCRIPT = """
+import json, sys, time
+t = time.perf_counter()
+import SearchEngine
+from gui import UltimateApp
+app = UltimateApp()
+while not app.winfo_viewable():
+    app.update()
+elapsed = time.perf_counter() - t
+app.job_queue.shutdown()
+app.destroy()
+print(json.dumps({"seconds": elapsed}))
+"""
+
+DEP_SCRIPT = """
+import json, sys, time
+t = time.perf_counter()
+import {name}
+print(json.dumps({{"seconds": time.perf_counter() - t}}))
+"""
+
+
+def run(script):
+    """Runs script in a fresh interpreter from the engine directory.
+    Returns (its JSON output, wall time including interpreter start)."""
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-c", f"HEAVY = {HEAVY!r}\n" + script], cwd=ENGINE_DIR,
+                          capture_output=True, text=True, timeout=120)
+    wall = time.perf_counter() - start
+    if proc.returncode != 0:
+        lines = proc.stderr.strip().splitlines()
+        raise RuntimeError(lines[-1] if lines else f"exit code {proc.returncode}")
+    return json.loads(proc.stdout.strip().splitlines()[-1]), wall
+
+
+def measure(script, runs):
+    inner, wall, last = [], [], None
+    for _ in range(runs):
+        last, w = run(script)
+        inner.append(last["seconds"])
+        wall.append(w)
+    return {
+        "median_ms": round(statistics.median(inner) * 1000, 1),
+        "min_ms": round(min(inner) * 1000, 1),
+        "median_wall_ms": round(statistics.median(wall) * 1000, 1),
+        "last": last,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import and first-window time of the Research Station.")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per measurement")
+    parser.add_argument("--skip-window", action="store_true", help="Do not open the window (no display)")
+    parser.add_argument("--skip-deps", action="store_true", help="Do not time the heavy dependencies")
+    parser.add_argument("--json", default=None, metavar="PATH", help="Also write the results to PATH")
+    args = parser.parse_args()
+
+    results = {}
+    r = measure(IMPORT_SCRIPT, args.runs)
+    results["import SearchEngine"] = r
+    loaded = r["last"]["loaded"]
+    print(f"import SearchEngine: import time {r['median_ms']:.1f} ms median, {r['min_ms']:.1f} ms min "
+          f"({r['median_wall_ms']:.0f} ms with interpreter start)")
+    print(f"  heavy modules loaded by the import: {', '.join(loaded) if loaded else 'none'}")
+
+    if not args.skip_window:
+        try:
+            r = measure(WINDOW_SCRIPT, args.runs)
+        except Exception as e:
+            print(f"first window: skipped ({e})")
+        else:
+            results["first window"] = r
+            print(f"first window: from import to mapped {r['median_ms']:.1f} ms median, {r['min_ms']:.1f} ms min "
+                  f"({r['median_wall_ms']:.0f} ms with interpreter start)")
+
+    if not args.skip_deps:
+        print("\nheavy dependencies, imported on their own:")
+        for name in HEAVY:
+            try:
+                r = measure(DEP_SCRIPT.format(name=name), args.runs)
+            except Exception as e:
+                print(f"  {name:<20} not available ({e})")
+                continue
+            results[f"import {name}"] = r
+            print(f"  {name:<20} {r['median_ms']:>8.1f} ms")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"created": time.strftime("%Y-%m-%d %H:%M:%S"), "runs": args.runs, "results": results},
+                      f, indent=4)
+        print(f"\nResults written to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+"""
+Time budgets and cancellation for report generation.
+Every depth has a total deadline and every stage its own budget, capped by
+what is left overall. Waiting on fetches goes through Budget.wait, which
+wakes up often enough to notice a cancel request from the GUI. Whatever
+has not arrived in time is recorded in Budget.missing and the report is
+exported without it.
+"""
+
+import concurrent.futures
+import threading
+import time
+
+DEADLINES = {"Fast": 15.0, "Normal": 30.0, "In-depth": 45.0}
+STAGE_BUDGETS = {"wikipedia": 8.0, "image": 10.0, "ddgs": 8.0, "scrape": 6.0}
+POLL_INTERVAL = 0.1
+
+
+class ReportCancelled(Exception):
+    pass
+
+
+class Budget:
+    def __init__(self, total_s=float("inf"), cancel_event=None):
+        self.total_s = total_s
+        self.cancel_event = cancel_event or threading.Event()
+        self.missing = []
+        self._start = time.monotonic()
+
+    @classmethod
+    def for_depth(cls, depth, cancel_event=None):
+        return cls(DEADLINES.get(depth, DEADLINES["Normal"]), cancel_event)
+
+    def restart(self):
+        """Starts the deadline again (for jobs that waited in a queue)."""
+        self._start = time.monotonic()
+
+    def remaining(self):
+        return self.total_s - (time.monotonic() - self._start)
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    def stopped(self):
+        """True once the report should stop fetching (cancelled or out of time)."""
+        return self.cancelled or self.remaining() <= 0
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def check(self):
+        if self.cancelled:
+            raise ReportCancelled("Report cancelled.")
+
+    def stage_left(self, stage, started):
+        """Seconds left for a stage that started at `started` (time.monotonic())."""
+        own = STAGE_BUDGETS.get(stage, float("inf")) - (time.monotonic() - started)
+        return max(0.0, min(own, self.remaining()))
+
+    def wait(self, futures, timeout):
+        """Waits up to timeout for futures, raising ReportCancelled as soon as
+        the user cancels. Returns True when all of them are done."""
+        end = time.monotonic() + timeout
+        pending = set(futures)
+        while pending:
+            self.check()
+            left = end - time.monotonic()
+            if left <= 0:
+                break
+            _, pending = concurrent.futures.wait(pending, timeout=min(POLL_INTERVAL, left))
+        self.check()
+        return not pending
+
+    def skip(self, what):
+        self.missing.append(what)
@@ -0,0 +1,148 @@
+"""
+PDF and Word exporters for report_model.Report.
+fpdf and python-docx are slow to import, so report_model only loads this
+module the first time a report is exported to one of these formats.
+"""
+
+import datetime
+
+from docx import Document
+from docx.shared import Inches
+from fpdf import FPDF
+
+import image_pipeline
+from report_model import exporter
+from sanitize import clean_text, clean_xml_text
+
+
+@exporter("Word (.docx)", ".docx")
+def export_docx(report, save_path):
+    generate_docx(report.topic, report.summaries, report.web_results, report.img_data, report.chart_data,
+                  save_path, report.note, report.created)
+
+
+@exporter("PDF", ".pdf")
+def export_pdf(report, save_path):
+    pdf = PDFReport(report.topic, report.img_data)
+    pdf.create_cover_page()
+    if report.note:
+        pdf.set_font('Arial', 'I', 9)
+        pdf.multi_cell(0, 5, clean_text(report.note))
+        pdf.ln(3)
+    for lang, summary in report.summaries:
+        pdf.add_section_title(f"Overview ({lang})")
+        pdf.add_paragraph(summary)
+        pdf.ln()
+    if report.chart_data:
+        pdf.add_section_title("Semantic Analysis")
+        pdf.image(image_pipeline.as_stream(report.chart_data), x=50, w=110)
+        pdf.ln(10)
+    if report.web_results:
+        pdf.add_section_title("Web Resources")
+        for res in report.web_results:
+            pdf.add_web_card(res['title'], res['body'], res['href'])
+    pdf.output(save_path)
+
+
+def generate_docx(topic, wiki_summary, web_results, img_data, chart_data, save_path, note=None, created=None):
+    doc = Document()
+    doc.add_heading(clean_xml_text(f'Report: {topic}'), 0)
+    
+    # The date the report was generated, also when it is exported again later
+    doc.add_paragraph(f"Generated on: {created[:10] if created else datetime.date.today()}")
+    if note:
+        doc.add_paragraph(clean_xml_text(note)).runs[0].italic = True
+
+    if img_data:
+        try:
+            doc.add_picture(image_pipeline.as_stream(img_data), width=Inches(4))
+        except: pass
+
+    # wiki_summary: the text, or [(language, text)] for a combined report
+    sections = [(None, wiki_summary)] if isinstance(wiki_summary, str) else wiki_summary
+    for lang, summary in sections:
+        doc.add_heading(f'General Overview ({lang})' if len(sections) > 1 else 'General Overview', level=1)
+        doc.add_paragraph(clean_xml_text(summary))
+
+    if chart_data:
+        doc.add_heading('Data Analysis', level=1)
+        try:
+            doc.add_picture(image_pipeline.as_stream(chart_data), width=Inches(5))
+        except: pass
+
+    if web_results:
+        doc.add_heading('Web Resources', level=1)
+        for res in web_results:
+            p = doc.add_paragraph()
+            runner = p.add_run(clean_xml_text(res['title']))
+            runner.bold = True
+            doc.add_paragraph(clean_xml_text(res['body']))
+            doc.add_paragraph(clean_xml_text(res['href']), style='Intense Quote')
+
+    doc.save(save_path)
+
+
+class PDFReport(FPDF):
+    def __init__(self, topic, cover_image=None):
+        super().__init__()
+        self.topic = clean_text(topic)
+        self.cover_image = cover_image
+        self.set_auto_page_break(auto=True, margin=15)
+
+    def header(self):
+        if self.page_no() > 1:
+            self.set_font('Arial', 'I', 8)
+            self.set_text_color(128)
+            self.cell(0, 10, f'Report: {self.topic}', 0, 0, 'R')
+            self.ln(10)
+
+    def footer(self):
+        self.set_y(-15)
+        self.set_font('Arial', 'I', 8)
+        self.set_text_color(128)
+        self.cell(0, 10, f'Page {self.page_no()}', 0, 0, 'C')
+
+    def create_cover_page(self):
+        self.add_page()
+        self.set_y(40)
+        self.set_font('Arial', 'B', 24)
+        self.set_text_color(33, 51, 99)
+        self.cell(0, 20, "REPORT PREMIUM", ln=True, align='C')
+        
+        if self.cover_image:
+            try:
+                self.image(image_pipeline.as_stream(self.cover_image), x=65, y=70, w=80)
+                self.set_y(160)
+            except:
+                self.set_y(100)
+        else:
+            self.set_y(100)
+
+        self.set_font('Arial', 'B', 32)
+        self.set_text_color(0)
+        self.cell(0, 20, self.topic, ln=True, align='C')
+        self.add_page()
+
+    def add_section_title(self, title):
+        self.set_font('Arial', 'B', 14)
+        self.set_text_color(33, 51, 99)
+        self.cell(0, 10, clean_text(title), 0, 1, 'L')
+        self.set_text_color(0)
+        self.ln(2)
+
+    def add_paragraph(self, text):
+        self.set_font('Arial', '', 11)
+        self.multi_cell(0, 6, clean_text(text))
+        self.ln(5)
+
+    def add_web_card(self, title, body, link):
+        self.set_fill_color(240, 240, 240)
+        self.set_font('Arial', 'B', 10)
+        self.cell(0, 8, clean_text(title), 0, 1, 'L', True)
+        self.set_font('Arial', '', 10)
+        self.multi_cell(0, 5, clean_text(body))
+        self.set_font('Arial', 'I', 8)
+        self.set_text_color(0, 0, 255)
+        self.cell(0, 5, clean_text(link), 0, 1)
+        self.set_text_color(0)
+        self.ln(3)
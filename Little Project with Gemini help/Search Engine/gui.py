@@ -0,0 +1,354 @@
+"""
+Research Station window (started by SearchEngine.py).
+Kept apart from the report pipeline so that headless users of
+SearchEngine (batch_report, the benchmarks) never import customtkinter.
+"""
+
+import os
+import threading
+import time
+import tkinter.messagebox as msgbox
+from tkinter import filedialog
+
+import customtkinter as ctk
+
+import instrumentation
+import report_model
+import search_index
+from budget import Budget, ReportCancelled
+from history_view import HistoryView
+from job_queue import JobQueue
+from SearchEngine import LANG_MAP, generate_multilang_report, generate_report, reexport_report
+
+
+class UltimateApp(ctk.CTk):
+    def __init__(self):
+        super().__init__()
+        self.title("Research Station Premium")
+        self.geometry("800x650")
+        ctk.set_appearance_mode("Dark")
+        ctk.set_default_color_theme("blue") 
+
+        # Tabs
+        self.tabview = ctk.CTkTabview(self, width=780, height=600)
+        self.tabview.pack(pady=10)
+        self.tabview.add("Search")
+        self.tabview.add("Queue")
+        self.tabview.add("History")
+        self.tabview.add("Past Research")
+        self.tabview.add("Settings")
+        
+        self.setup_search_tab()
+        self.setup_queue_tab()
+        self.setup_history_tab()
+        self.setup_past_research_tab()
+        self.setup_settings_tab()
+
+    def setup_search_tab(self):
+        tab = self.tabview.tab("Search")
+        
+        ctk.CTkLabel(tab, text="Research Station", font=("Arial", 28, "bold"), text_color="#4B8BBE").pack(pady=15)
+        
+        self.entry = ctk.CTkEntry(tab, placeholder_text="Topic...", width=500, height=45, font=("Arial", 14))
+        self.entry.pack(pady=10)
+
+        frame = ctk.CTkFrame(tab, fg_color="transparent")
+        frame.pack(pady=5)
+        
+        ctk.CTkLabel(frame, text="Language:").grid(row=0, column=0, padx=5)
+        self.opt_lang = ctk.CTkOptionMenu(frame, values=["Italiano", "English", "Français", "Deutsch"])
+        self.opt_lang.grid(row=0, column=1, padx=10)
+        
+        ctk.CTkLabel(frame, text="Depth:").grid(row=0, column=2, padx=5)
+        self.seg_depth = ctk.CTkSegmentedButton(frame, values=["Fast", "Normal", "In-depth"])
+        self.seg_depth.set("Normal")
+        self.seg_depth.grid(row=0, column=3, padx=10)
+
+        ctk.CTkLabel(frame, text="Format:").grid(row=1, column=0, padx=5, pady=10)
+        self.opt_format = ctk.CTkOptionMenu(frame, values=["PDF", "Word (.docx)", "HTML (.html)"])
+        self.opt_format.grid(row=1, column=1, padx=10, pady=10)
+
+        self.chk_refresh = ctk.CTkCheckBox(frame, text="Force refresh (ignore cache)")
+        self.chk_refresh.grid(row=1, column=2, columnspan=2, padx=10, pady=10)
+
+        # Multi-language mode: one shared fetch, a summary per language
+        langs = ctk.CTkFrame(tab, fg_color="transparent")
+        langs.pack(pady=5)
+        ctk.CTkLabel(langs, text="Also in:").pack(side="left", padx=5)
+        self.chk_langs = {}
+        for name in LANG_MAP:
+            self.chk_langs[name] = ctk.CTkCheckBox(langs, text=name, width=70)
+            self.chk_langs[name].pack(side="left", padx=3)
+        self.chk_combined = ctk.CTkCheckBox(langs, text="One combined report", width=70)
+        self.chk_combined.select()
+        self.chk_combined.pack(side="left", padx=10)
+
+        self.btn_go = ctk.CTkButton(tab, text="START SEARCH", width=250, height=50, font=("Arial", 16, "bold"), command=self.ask_save)
+        self.btn_go.pack(pady=20)
+
+        self.btn_cancel = ctk.CTkButton(tab, text="CANCEL", width=120, fg_color="#B23A48", command=self.cancel_report)
+        self.btn_cancel.pack_forget()
+        self.budget = None
+
+        self.progress = ctk.CTkProgressBar(tab, width=500, mode="indeterminate")
+        self.progress.pack_forget()
+        self.status = ctk.CTkLabel(tab, text="Ready.", text_color="gray")
+        self.status.pack(pady=5)
+        
+        self.btn_open = ctk.CTkButton(tab, text="OPEN FILE", fg_color="#E09F3E", state="disabled", command=self.open_current)
+        self.btn_open.pack_forget()
+        self.saved_path = None
+
+    def setup_queue_tab(self):
+        tab = self.tabview.tab("Queue")
+        self.job_queue = JobQueue(generate_report, on_update=lambda job: self.after(0, self.update_job_row, job))
+        self.job_rows = {}
+        self.queue_dir = None
+
+        self.queue_topics = ctk.CTkTextbox(tab, width=700, height=110)
+        self.queue_topics.pack(pady=(10, 5))
+        self.queue_topics.insert("1.0", "One topic per line...")
+
+        frame = ctk.CTkFrame(tab, fg_color="transparent")
+        frame.pack(pady=5)
+        self.queue_lang = ctk.CTkOptionMenu(frame, values=list(LANG_MAP), width=110)
+        self.queue_lang.grid(row=0, column=0, padx=5)
+        self.queue_depth = ctk.CTkSegmentedButton(frame, values=["Fast", "Normal", "In-depth"])
+        self.queue_depth.set("Normal")
+        self.queue_depth.grid(row=0, column=1, padx=5)
+        # Both ticked: one fetch per topic, exported twice
+        self.queue_pdf = ctk.CTkCheckBox(frame, text="PDF", width=60)
+        self.queue_pdf.select()
+        self.queue_pdf.grid(row=0, column=2, padx=5)
+        self.queue_docx = ctk.CTkCheckBox(frame, text="Word", width=60)
+        self.queue_docx.grid(row=0, column=3, padx=5)
+        ctk.CTkButton(frame, text="Add to Queue", width=120, command=self.queue_add).grid(row=0, column=4, padx=5)
+
+        self.queue_status = ctk.CTkLabel(tab, text="Reports run a few at a time; duplicates are skipped.", text_color="gray")
+        self.queue_status.pack()
+        self.queue_list = ctk.CTkScrollableFrame(tab, width=700, height=280)
+        self.queue_list.pack(pady=5)
+
+        buttons = ctk.CTkFrame(tab, fg_color="transparent")
+        buttons.pack(pady=5)
+        ctk.CTkButton(buttons, text="Cancel All", width=120, fg_color="#B23A48", command=self.job_queue.cancel_all).pack(side="left", padx=5)
+        ctk.CTkButton(buttons, text="Clear Finished", width=120, command=self.queue_clear).pack(side="left", padx=5)
+
+    def queue_add(self):
+        topics = [t.strip() for t in self.queue_topics.get("1.0", "end").splitlines()]
+        topics = [t for t in topics if t and t != "One topic per line..."]
+        formats = (["PDF"] if self.queue_pdf.get() else []) + (["Word (.docx)"] if self.queue_docx.get() else [])
+        if not topics or not formats: return
+        if not self.queue_dir:
+            self.queue_dir = filedialog.askdirectory(title="Save Reports In")
+            if not self.queue_dir: return
+
+        added = skipped = 0
+        for topic in topics:
+            for fmt in formats:
+                job, is_new = self.job_queue.submit(topic, self.queue_lang.get(), self.queue_depth.get(), fmt, self.queue_dir)
+                if is_new: added += 1
+                else: skipped += 1
+        self.queue_status.configure(text=f"{added} queued, {skipped} already in progress -> {self.queue_dir}", text_color="gray")
+
+    def update_job_row(self, job):
+        row = self.job_rows.get(job.id)
+        if row is None:
+            frame = ctk.CTkFrame(self.queue_list)
+            frame.pack(fill="x", pady=2, padx=5)
+            label = ctk.CTkLabel(frame, anchor="w", justify="left")
+            label.pack(side="left", fill="x", expand=True, padx=10)
+            button = ctk.CTkButton(frame, text="Cancel", width=80, fg_color="#B23A48", command=job.cancel)
+            button.pack(side="right", padx=5, pady=3)
+            row = self.job_rows[job.id] = (frame, label, button)
+        frame, label, button = row
+
+        text = f"{job.topic} ({job.lang}, {job.depth}, {job.fmt.split(' (')[0]}) - {job.status}"
+        if job.stage: text += f": {job.stage}"
+        if job.seconds is not None: text += f" [{job.seconds}s]"
+        if job.error: text += f"\n{job.error}"
+        elif job.missing: text += f"\nmissing: {', '.join(job.missing)}"
+        colors = {"done": "green", "partial": "orange", "failed": "red", "cancelled": "gray"}
+        label.configure(text=text, text_color=colors.get(job.status, ("black", "white")))
+
+        if job.status in ("done", "partial"):
+            button.configure(text="Open", fg_color="#E09F3E", command=lambda p=job.path: self.safe_open(p))
+            self.history_view.add_new()
+        elif job.status in ("failed", "cancelled"):
+            button.pack_forget()
+
+    def queue_clear(self):
+        self.job_queue.clear_finished()
+        alive = {job.id for job in self.job_queue.jobs}
+        for job_id in list(self.job_rows):
+            if job_id not in alive:
+                self.job_rows.pop(job_id)[0].destroy()
+
+    def setup_history_tab(self):
+        tab = self.tabview.tab("History")
+        # Only the visible rows are real widgets, entries load in the background
+        self.history_view = HistoryView(tab, on_open=self.safe_open, on_export=self.export_again, width=700, height=450)
+        self.history_view.pack(pady=10, fill="x")
+        self.refresh_history()
+        
+        ctk.CTkButton(tab, text="Refresh List", command=self.refresh_history).pack(pady=5)
+
+    def refresh_history(self):
+        self.history_view.reload()
+
+    def export_again(self, entry):
+        # From the saved report model: no network, any format
+        base = os.path.splitext(entry["path"])[0]
+        types = [(fmt, "*" + ext) for fmt, ext in report_model.formats().items()]
+        path = filedialog.asksaveasfilename(title="Export Report", initialfile=os.path.basename(base),
+                                            filetypes=types, defaultextension=".pdf")
+        if not path: return
+        def work():
+            try:
+                reexport_report(entry["data"], path)
+                self.after(0, self.history_view.add_new)
+                self.after(0, lambda: msgbox.showinfo("Export", f"Saved {os.path.basename(path)}"))
+            except Exception as e:
+                err = str(e)
+                self.after(0, lambda: msgbox.showerror("Error", err))
+        threading.Thread(target=work, daemon=True).start()
+
+    def setup_past_research_tab(self):
+        tab = self.tabview.tab("Past Research")
+        frame = ctk.CTkFrame(tab, fg_color="transparent")
+        frame.pack(pady=10)
+        self.past_entry = ctk.CTkEntry(frame, placeholder_text="Search everything collected so far...", width=500, height=40)
+        self.past_entry.pack(side="left", padx=5)
+        self.past_entry.bind("<Return>", lambda e: self.search_past())
+        ctk.CTkButton(frame, text="Search", width=100, height=40, command=self.search_past).pack(side="left", padx=5)
+
+        self.past_status = ctk.CTkLabel(tab, text="Searches the local index only, no network.", text_color="gray")
+        self.past_status.pack()
+        self.past_results = ctk.CTkScrollableFrame(tab, width=700, height=400)
+        self.past_results.pack(pady=10)
+
+    def search_past(self):
+        query = self.past_entry.get().strip()
+        if not query: return
+        start = time.perf_counter()
+        try:
+            results = search_index.get_index().search(query, k=20)
+        except Exception as e:
+            self.past_status.configure(text=f"Error: {e}", text_color="red")
+            return
+        elapsed = (time.perf_counter() - start) * 1000
+        self.past_status.configure(text=f"{len(results)} results in {elapsed:.1f} ms", text_color="gray")
+
+        for w in self.past_results.winfo_children(): w.destroy()
+        for r in results:
+            f = ctk.CTkFrame(self.past_results)
+            f.pack(fill="x", pady=3, padx=5)
+            ctk.CTkLabel(f, text=f"[{r.get('date', '')}] {r.get('topic', '')}", font=("Arial", 13, "bold"), anchor="w").pack(fill="x", padx=10)
+            ctk.CTkLabel(f, text=r.get('snippet', ''), anchor="w", justify="left", wraplength=560).pack(fill="x", padx=10)
+            ctk.CTkButton(f, text="Open", width=80, command=lambda p=r.get('path', ''): self.safe_open(p)).pack(anchor="e", padx=10, pady=3)
+
+    def safe_open(self, path):
+        if os.path.exists(path):
+            os.startfile(path)
+        else:
+            msgbox.showerror("Error", "The file no longer exists.")
+
+    def setup_settings_tab(self):
+        tab = self.tabview.tab("Settings")
+        ctk.CTkLabel(tab, text="App Theme", font=("Arial", 18)).pack(pady=20)
+        self.seg_theme = ctk.CTkSegmentedButton(tab, values=["Blue", "Green", "Dark-Blue"], command=self.change_theme)
+        self.seg_theme.set("Blue")
+        self.seg_theme.pack(pady=10)
+        ctk.CTkLabel(tab, text="(Requires restart to fully apply to all elements)", text_color="gray").pack()
+
+        ctk.CTkLabel(tab, text="Diagnostics", font=("Arial", 18)).pack(pady=(30, 10))
+        self.chk_profile = ctk.CTkCheckBox(tab, text="Profile chart and export (saves <report>.prof)")
+        self.chk_profile.pack(pady=5)
+        ctk.CTkLabel(tab, text=f"Stage timings are logged to {instrumentation.LOG_FILE}", text_color="gray").pack()
+
+    def change_theme(self, value):
+        ctk.set_default_color_theme(value.lower())
+        msgbox.showinfo("Theme", f"You selected {value}. Restart the app to see all changes.")
+
+    def ask_save(self):
+        topic = self.entry.get().strip()
+        fmt = self.opt_format.get()
+        ext = report_model.extension(fmt)
+        
+        path = filedialog.asksaveasfilename(defaultextension=ext, title="Save Report", initialfile=f"{topic}{ext}")
+        if path:
+            self.toggle_ui(False)
+            self.progress.pack()
+            self.progress.start()
+            self.btn_cancel.pack(pady=5)
+            self.btn_cancel.configure(state="normal")
+            depth = self.seg_depth.get()
+            force = bool(self.chk_refresh.get())
+            profile = bool(self.chk_profile.get())
+            # Deadline for this depth; the Cancel button trips it
+            self.budget = Budget.for_depth(depth)
+            lang = self.opt_lang.get()
+            langs = [lang] + [name for name, chk in self.chk_langs.items() if chk.get() and name != lang]
+            combined = bool(self.chk_combined.get())  # Widgets are only read here, on the UI thread
+            threading.Thread(target=self.worker, daemon=True,
+                             args=(topic, langs, depth, path, fmt, force, profile, self.budget, combined)).start()
+
+    def cancel_report(self):
+        if self.budget:
+            self.budget.cancel()
+            self.btn_cancel.configure(state="disabled")
+            self.status.configure(text="Cancelling...", text_color="gray")
+
+    def report_progress(self, event, span, active, done):
+        # Called from the fetch threads: hand the update over to the UI thread
+        if active:
+            text = f"Running: {', '.join(active[:3])}{' ...' if len(active) > 3 else ''} ({done} stages done)"
+        else:
+            text = f"{done} stages done"
+        self.after(0, lambda: self.status.configure(text=text, text_color="gray"))
+
+    def worker(self, topic, langs, depth, path, fmt, force_refresh=False, profile=False, budget=None, combined=True):
+        try:
+            if len(langs) > 1:
+                paths = generate_multilang_report(topic, langs, depth, path, fmt, combined,
+                                                  force_refresh, progress=self.report_progress, profile=profile,
+                                                  budget=budget)
+                path = paths[0]
+            else:
+                generate_report(topic, langs[0], depth, path, fmt, force_refresh,
+                                progress=self.report_progress, profile=profile, budget=budget)
+            self.saved_path = path
+            self.after(0, lambda: self.on_success(budget.missing if budget else []))
+        except ReportCancelled:
+            self.after(0, lambda: self.on_fail("Cancelled."))
+        except Exception as e:
+            print(e)
+            err = str(e)  # e is unbound once the except block ends
+            self.after(0, lambda: self.on_fail(err))
+
+    def on_success(self, missing=None):
+        self.progress.stop()
+        self.progress.pack_forget()
+        self.btn_cancel.pack_forget()
+        if missing:
+            self.status.configure(text=f"Completed (partial, missing: {', '.join(missing)})", text_color="orange")
+        else:
+            self.status.configure(text="Completed!", text_color="green")
+        self.btn_open.pack(pady=10)
+        self.btn_open.configure(state="normal")
+        self.toggle_ui(True)
+        self.history_view.add_new()
+
+    def on_fail(self, err):
+        self.progress.stop()
+        self.progress.pack_forget()
+        self.btn_cancel.pack_forget()
+        self.status.configure(text=f"Error: {err}", text_color="red")
+        self.toggle_ui(True)
+        
+    def toggle_ui(self, enable):
+        state = "normal" if enable else "disabled"
+        self.btn_go.configure(state=state)
+        
+    def open_current(self):
+        if self.saved_path: os.startfile(self.saved_path)
@@ -0,0 +1,152 @@
+"""
+Search history backend.
+A small SQLite database replaces search_history.json:
+- every write is one transaction, so threads and batch worker processes
+  can finish reports at the same time without losing entries
+- nothing is thrown away; callers page through it with limit/offset
+- topic and date are indexed for lookups
+An existing search_history.json is imported automatically the first time.
+"""
+
+import datetime
+import json
+import os
+import sqlite3
+import threading
+
+HISTORY_DB = "search_history.sqlite"
+LEGACY_FILE = "search_history.json"
+DATE_FORMAT = "%Y-%m-%d %H:%M"
+
+
+class HistoryStore:
+    def __init__(self, path=HISTORY_DB, legacy_file=LEGACY_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        # Autocommit mode: transactions are opened explicitly below
+        self._db = sqlite3.connect(path, timeout=10, check_same_thread=False, isolation_level=None)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS history (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                topic TEXT NOT NULL,
+                topic_key TEXT NOT NULL,
+                date TEXT NOT NULL,
+                path TEXT NOT NULL,
+                lang TEXT,
+                depth TEXT,
+                format TEXT,
+                data TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_history_topic ON history (topic_key, date);
+            CREATE INDEX IF NOT EXISTS idx_history_date ON history (date);
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+        """)
+        if legacy_file:
+            self._migrate(legacy_file)
+
+    def _migrate(self, legacy_file):
+        if not os.path.exists(legacy_file):
+            return
+        try:
+            with open(legacy_file, "r") as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            entries = []
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                # Checked inside the transaction: another process may be migrating too
+                if self._db.execute("SELECT value FROM meta WHERE key='migrated_json'").fetchone():
+                    self._db.execute("COMMIT")
+                    return
+                # The JSON file is newest first
+                for e in reversed(entries):
+                    if not isinstance(e, dict) or "topic" not in e:
+                        continue
+                    self._db.execute(
+                        "INSERT INTO history (topic, topic_key, date, path) VALUES (?, ?, ?, ?)",
+                        (e["topic"], _key(e["topic"]), e.get("date", ""), e.get("path", "")),
+                    )
+                self._db.execute("INSERT INTO meta VALUES ('migrated_json', ?)", (legacy_file,))
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def add(self, topic, path, lang=None, depth=None, fmt=None, date=None, data=None):
+        """Stores one report (data: its saved report model, see report_model).
+        Returns the new id, or None for a repeat of the latest entry."""
+        date = date or datetime.datetime.now().strftime(DATE_FORMAT)
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                last = self._db.execute("SELECT topic, path FROM history ORDER BY id DESC LIMIT 1").fetchone()
+                # Avoid identical recent duplicates
+                if last and last["topic"] == topic and last["path"] == path:
+                    self._db.execute("COMMIT")
+                    return None
+                cur = self._db.execute(
+                    "INSERT INTO history (topic, topic_key, date, path, lang, depth, format, data) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (topic, _key(topic), date, path, lang, depth, fmt, data),
+                )
+                self._db.execute("COMMIT")
+                return cur.lastrowid
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return [dict(row) for row in self._db.execute(sql, params).fetchall()]
+
+    def page(self, offset=0, limit=20):
+        """Newest first."""
+        return self._query("SELECT * FROM history ORDER BY id DESC LIMIT ? OFFSET ?", (limit, offset))
+
+    def before(self, last_id, limit=20):
+        """Keyset paging: entries older than last_id, newest first.
+        Unlike offsets it stays stable while new entries are being added."""
+        return self._query("SELECT * FROM history WHERE id < ? ORDER BY id DESC LIMIT ?", (last_id, limit))
+
+    def count(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM history").fetchone()[0]
+
+    def since(self, last_id):
+        """Entries added after last_id, newest first."""
+        return self._query("SELECT * FROM history WHERE id > ? ORDER BY id DESC", (last_id,))
+
+    def by_topic(self, topic, limit=100):
+        return self._query(
+            "SELECT * FROM history WHERE topic_key = ? ORDER BY date DESC, id DESC LIMIT ?", (_key(topic), limit)
+        )
+
+    def by_date(self, start, end=None, limit=100, offset=0):
+        """Entries with start <= date < end. Dates as 'YYYY-MM-DD' or 'YYYY-MM-DD HH:MM'."""
+        end = end or "9999"
+        return self._query(
+            "SELECT * FROM history WHERE date >= ? AND date < ? ORDER BY date DESC, id DESC LIMIT ? OFFSET ?",
+            (start, end, limit, offset),
+        )
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def _key(topic):
+    return topic.strip().lower()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = HistoryStore()
+        return _store
@@ -0,0 +1,182 @@
+"""
+Virtualized history list for the History tab.
+Only the visible rows exist as widgets: scrolling re-binds the same
+frames/labels/buttons to other entries instead of creating new ones.
+Entries are read from the history store on a background thread, a page
+at a time, and new reports are prepended as a diff.
+"""
+
+import threading
+
+import customtkinter as ctk
+
+import history_store
+
+
+class HistoryView(ctk.CTkFrame):
+    ROW_HEIGHT = 40
+    PAGE_SIZE = 200
+
+    def __init__(self, master, on_open, on_export=None, rows=11, **kwargs):
+        super().__init__(master, **kwargs)
+        self.on_open = on_open
+        self.on_export = on_export
+        self.entries = []      # Loaded entries, newest first
+        self.total = 0         # Entries in the store
+        self.first = 0         # Index of the entry shown in the top row
+        self._pending_first = None
+        self._loading = False
+        self._bound = [None] * rows  # Entry id currently shown by each row
+
+        self.grid_columnconfigure(0, weight=1)
+        self.rows = []
+        for i in range(rows):
+            f = ctk.CTkFrame(self, height=self.ROW_HEIGHT - 4)
+            label = ctk.CTkLabel(f, text="", anchor="w", width=300)
+            label.pack(side="left", padx=10)
+            button = ctk.CTkButton(f, text="Open", width=80)
+            button.pack(side="right", padx=10)
+            # Only for entries with a saved report model
+            export = ctk.CTkButton(f, text="Export", width=80, fg_color="#3A7D44")
+            f.grid(row=i, column=0, sticky="ew", pady=2, padx=5)
+            f.grid_remove()
+            for widget in (f, label, button, export):
+                self._bind_wheel(widget)
+            self.rows.append((f, label, button, export))
+
+        self.empty = ctk.CTkLabel(self, text="Loading...")
+        self.empty.grid(row=0, column=0, pady=20)
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.grid(row=0, column=1, rowspan=rows, sticky="ns")
+        self._bind_wheel(self)
+
+    # --- Loading (off the UI thread) ---
+    def _run_in_background(self, work, done):
+        def runner():
+            try:
+                result = work()
+            except Exception as e:
+                print(f"History: {e}")
+                result = None
+            self.after(0, lambda: done(result))
+        threading.Thread(target=runner, daemon=True).start()
+
+    def reload(self):
+        """Reads the newest page again, dropping what was loaded."""
+        if self._loading: return
+        self._loading = True
+        def work():
+            store = history_store.get_store()
+            return store.page(0, self.PAGE_SIZE), store.count()
+        def done(result):
+            self._loading = False
+            if result is None: return
+            self.entries, self.total = result
+            self.first = 0
+            self._render()
+        self._run_in_background(work, done)
+
+    def add_new(self):
+        """Prepends only the entries written since the newest one shown."""
+        if not self.entries:
+            return self.reload()
+        last_id = self.entries[0]["id"]
+        def work():
+            store = history_store.get_store()
+            return store.since(last_id), store.count()
+        def done(result):
+            if result is None: return
+            new, self.total = result
+            new = [e for e in new if e["id"] > self.entries[0]["id"]] if self.entries else new
+            if not new: return
+            self.entries[:0] = new
+            if self.first:
+                # Keep the rows the user is looking at in place
+                self.first += len(new)
+            self._render()
+        self._run_in_background(work, done)
+
+    def _load_more(self, needed):
+        if self._loading or len(self.entries) >= self.total: return
+        self._loading = True
+        last_id = self.entries[-1]["id"] if self.entries else 2 ** 63 - 1
+        limit = max(needed - len(self.entries), 0) + self.PAGE_SIZE
+        def work():
+            return history_store.get_store().before(last_id, limit)
+        def done(older):
+            self._loading = False
+            if older is None: return
+            self.entries.extend(older)
+            if not older:
+                self.total = len(self.entries)
+            if self._pending_first is not None:
+                first, self._pending_first = self._pending_first, None
+                self.scroll_to(first)
+            else:
+                self._render()
+        self._run_in_background(work, done)
+
+    # --- Scrolling ---
+    def scroll_to(self, first):
+        visible = len(self.rows)
+        first = min(max(0, int(first)), max(0, self.total - visible))
+        if first + visible > len(self.entries) and len(self.entries) < self.total:
+            # Not loaded yet: show what we have and fetch the rest
+            self._pending_first = first
+            self._load_more(first + visible)
+            first = min(first, max(0, len(self.entries) - visible))
+        self.first = first
+        self._render()
+
+    def _on_scrollbar(self, *args):
+        if args[0] == "moveto":
+            self.scroll_to(float(args[1]) * self.total)
+        elif args[0] == "scroll":
+            step = int(args[1]) * (len(self.rows) if args[2] == "pages" else 1)
+            self.scroll_to(self.first + step)
+
+    def _on_wheel(self, event):
+        if getattr(event, "num", None) == 4 or getattr(event, "delta", 0) > 0:
+            self.scroll_to(self.first - 3)
+        else:
+            self.scroll_to(self.first + 3)
+
+    def _bind_wheel(self, widget):
+        widget.bind("<MouseWheel>", self._on_wheel)
+        widget.bind("<Button-4>", self._on_wheel)
+        widget.bind("<Button-5>", self._on_wheel)
+
+    # --- Drawing ---
+    def _render(self):
+        visible = self.entries[self.first:self.first + len(self.rows)]
+        for i, (f, label, button, export) in enumerate(self.rows):
+            if i < len(visible):
+                h = visible[i]
+                if self._bound[i] != h["id"]:
+                    # Recycle the row: only text and command change
+                    label.configure(text=f"[{h['date']}] {h['topic']}")
+                    button.configure(command=lambda p=h["path"]: self.on_open(p))
+                    if h.get("data") and self.on_export:
+                        export.configure(command=lambda e=h: self.on_export(e))
+                        export.pack(side="right")
+                    else:
+                        export.pack_forget()
+                    self._bound[i] = h["id"]
+                    f.grid()
+            elif self._bound[i] is not None:
+                f.grid_remove()
+                self._bound[i] = None
+
+        if self.entries:
+            self.empty.grid_remove()
+        else:
+            self.empty.configure(text="No recent searches.")
+            self.empty.grid()
+
+        if self.total:
+            self.scrollbar.set(self.first / self.total, (self.first + len(visible)) / self.total)
+        else:
+            self.scrollbar.set(0, 1)
+
+        if self.first + 2 * len(self.rows) >= len(self.entries):
+            self._load_more(self.first + 2 * len(self.rows))
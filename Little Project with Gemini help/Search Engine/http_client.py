@@ -0,0 +1,128 @@
+"""
+Shared HTTP layer for the Research Station.
+Every fetcher (smart_scrape, download_image, ...) goes through one pooled
+requests.Session, so connections are kept alive and reused between URLs
+and between reports.
+"""
+
+import threading
+from urllib.parse import urlparse
+
+# --- CONFIG ---
+POOL_HOSTS = 20        # How many hosts keep a connection pool
+POOL_SIZE = 10         # Keep-alive connections kept per host
+PER_HOST_LIMIT = 2     # Parallel requests allowed against the same host
+RETRIES = 2            # Retries on connection errors and 429/5xx
+BACKOFF = 0.3          # Seconds, doubled at every retry
+USER_AGENT = "Mozilla/5.0"
+
+_session = None
+_session_lock = threading.Lock()
+_host_slots = {}
+_host_slots_lock = threading.Lock()
+
+
+def _build_session():
+    # Imported here: requests only loads once the first report goes online
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    retry = Retry(
+        total=RETRIES,
+        backoff_factor=BACKOFF,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(["GET", "HEAD"]),
+    )
+    adapter = HTTPAdapter(pool_connections=POOL_HOSTS, pool_maxsize=POOL_SIZE, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({"User-Agent": USER_AGENT, "Accept-Encoding": "gzip, deflate"})
+    return session
+
+
+def configure(pool_hosts=None, pool_size=None, per_host_limit=None, retries=None, backoff=None):
+    """Changes the pool settings. The session is rebuilt on the next request."""
+    global POOL_HOSTS, POOL_SIZE, PER_HOST_LIMIT, RETRIES, BACKOFF
+    if pool_hosts is not None: POOL_HOSTS = pool_hosts
+    if pool_size is not None: POOL_SIZE = pool_size
+    if per_host_limit is not None: PER_HOST_LIMIT = per_host_limit
+    if retries is not None: RETRIES = retries
+    if backoff is not None: BACKOFF = backoff
+    close()
+
+
+def get_session():
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = _build_session()
+        return _session
+
+
+def close():
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+    with _host_slots_lock:
+        _host_slots.clear()
+
+
+def host_slot(url):
+    # One semaphore per host, so we never hammer a single site
+    host = urlparse(url).netloc.lower()
+    with _host_slots_lock:
+        if host not in _host_slots:
+            _host_slots[host] = threading.BoundedSemaphore(PER_HOST_LIMIT)
+        return _host_slots[host]
+
+
+def get(url, **kwargs):
+    """GET through the shared session, respecting the per-host limit.
+    With stream=True the body is read after this returns, so the host slot
+    stays taken until the caller closes the response: always close it."""
+    slot = host_slot(url)
+    slot.acquire()
+    try:
+        response = get_session().get(url, **kwargs)
+    except:
+        slot.release()
+        raise
+    if not kwargs.get("stream"):
+        slot.release()  # Body already downloaded
+        return response
+
+    close = response.close
+    released = threading.Lock()
+
+    def close_and_release():
+        try:
+            close()
+        finally:
+            # Only the first close gives the slot back
+            if released.acquire(blocking=False):
+                slot.release()
+
+    response.close = close_and_release
+    return response
+
+
+def stats():
+    """Connection reuse counters, summed over every host pool still alive.
+    'reused' growing faster than 'connections' means pooling is working."""
+    result = {"requests": 0, "connections": 0, "hosts": 0}
+    session = get_session()
+    for adapter in {id(a): a for a in session.adapters.values()}.values():
+        pools = adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            result["hosts"] += 1
+            result["requests"] += pool.num_requests
+            result["connections"] += pool.num_connections
+    result["reused"] = max(result["requests"] - result["connections"], 0)
+    return result
@@ -0,0 +1,128 @@
+"""
+Per-stage timing for report generation.
+A Trace collects named spans (one per stage and one per scraped URL)
+with their duration and the bytes they fetched, tells a listener when
+stages start and end (the GUI status label), and appends one JSON line
+per report to LOG_FILE. Optionally cProfile can wrap the CPU-heavy stages.
+"""
+
+import datetime
+import io
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+LOG_FILE = "report_timings.jsonl"
+
+_local = threading.local()
+
+
+def add_bytes(n):
+    """Counts n fetched bytes on the innermost span open in this thread (if any)."""
+    stack = getattr(_local, "stack", None)
+    if stack:
+        stack[-1]["bytes"] += n
+
+
+class Trace:
+    def __init__(self, name, on_event=None, log_file=LOG_FILE, profile=False, **meta):
+        self.name = name
+        self.meta = meta
+        self.on_event = on_event
+        self.log_file = log_file
+        self.profile = profile
+        self.spans = []
+        self.active = []
+        self.started = datetime.datetime.now()
+        self._t0 = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def _notify(self, event, span):
+        if self.on_event:
+            try:
+                self.on_event(event, span, list(self.active), len(self.spans))
+            except Exception:
+                pass
+
+    @contextmanager
+    def span(self, name, **attrs):
+        span = {"name": name, "start_s": round(time.perf_counter() - self._t0, 4), "bytes": 0,
+                "thread": threading.current_thread().name}
+        span.update(attrs)
+        stack = _local.__dict__.setdefault("stack", [])
+        if stack:
+            span["parent"] = stack[-1]["name"]
+        stack.append(span)
+        with self._lock:
+            self.active.append(name)
+        self._notify("start", span)
+        start = time.perf_counter()
+        try:
+            yield span
+        except BaseException as e:
+            span["error"] = type(e).__name__
+            raise
+        finally:
+            span["duration_s"] = round(time.perf_counter() - start, 4)
+            stack.pop()
+            if stack:
+                # Nested spans also count towards their parent
+                stack[-1]["bytes"] += span["bytes"]
+            with self._lock:
+                self.active.remove(name)
+                self.spans.append(span)
+            self._notify("end", span)
+
+    @contextmanager
+    def profiled(self, name, output_path=None):
+        """A span that also runs cProfile when the trace was created with profile=True."""
+        with self.span(name) as span:
+            if not self.profile:
+                yield span
+                return
+            import cProfile, pstats  # Only when profiling was asked for
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                yield span
+            finally:
+                profiler.disable()
+                if output_path:
+                    profiler.dump_stats(output_path)
+                    span["profile"] = output_path
+                out = io.StringIO()
+                pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(15)
+                span["profile_top"] = out.getvalue().splitlines()[:40]
+
+    def total(self):
+        return round(time.perf_counter() - self._t0, 4)
+
+    def finish(self, status="ok", **extra):
+        record = {
+            "trace": self.name,
+            "started": self.started.strftime("%Y-%m-%d %H:%M:%S"),
+            "total_s": self.total(),
+            "status": status,
+            "bytes": sum(s["bytes"] for s in self.spans if "parent" not in s),
+        }
+        record.update(self.meta)
+        record.update(extra)
+        record["spans"] = sorted(self.spans, key=lambda s: s["start_s"])
+        if self.log_file:
+            try:
+                with self._lock, open(self.log_file, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+            except OSError as e:
+                print(f"Timing log: {e}")
+        return record
+
+    def summary(self):
+        slowest = sorted(self.spans, key=lambda s: s["duration_s"], reverse=True)[:3]
+        parts = ", ".join(f"{s['name']} {s['duration_s']:.2f}s" for s in slowest)
+        return f"{self.name}: {self.total():.2f}s (slowest: {parts})"
+
+
+def profile_path(save_path):
+    return os.path.splitext(save_path)[0] + ".prof"
@@ -0,0 +1,174 @@
+"""
+Job queue for running many reports at once from the GUI.
+Jobs run on a bounded pool of worker threads (the fetches are I/O bound and
+already parallel inside each report). A job identical to one still in flight
+(same topic, language, depth and format) is not queued twice, and jobs that
+differ only in format share one fetch: the first one to start downloads,
+the others wait for its data and only do their own export.
+"""
+
+import itertools
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from batch_report import EXTENSIONS, safe_filename
+from budget import Budget, ReportCancelled
+
+MAX_JOBS = 3  # Reports running at the same time
+
+FINISHED = ("done", "partial", "failed", "cancelled")
+
+
+class SharedFetch:
+    """Fetched data of one (topic, language, depth), shared by its jobs."""
+
+    def __init__(self):
+        self.future = Future()
+        self._claimed = False
+        self._lock = threading.Lock()
+
+    def claim(self):
+        """True for the first caller only: that one runs the fetch and
+        publishes it through self.future."""
+        with self._lock:
+            if self._claimed:
+                return False
+            self._claimed = True
+            return True
+
+
+class Job:
+    _ids = itertools.count(1)
+
+    def __init__(self, topic, lang, depth, fmt, path, force_refresh=False):
+        self.id = next(Job._ids)
+        self.topic = topic
+        self.lang = lang
+        self.depth = depth
+        self.fmt = fmt
+        self.path = path
+        self.force_refresh = force_refresh
+        self.status = "queued"
+        self.stage = ""
+        self.error = None
+        self.missing = []
+        self.budget = Budget.for_depth(depth)
+        self.shared = None
+        self.started = None
+        self.finished = None
+
+    @property
+    def fetch_key(self):
+        return (self.topic.strip().lower(), self.lang, self.depth, self.force_refresh)
+
+    @property
+    def key(self):
+        return self.fetch_key + (self.fmt,)
+
+    @property
+    def seconds(self):
+        if self.started is None:
+            return None
+        return round((self.finished or time.monotonic()) - self.started, 1)
+
+    def cancel(self):
+        self.budget.cancel()
+
+
+class JobQueue:
+    def __init__(self, run_report, max_workers=MAX_JOBS, on_update=None):
+        """run_report is generate_report (passed in so this module does not
+        import the GUI). on_update(job) is called from worker threads on
+        every status or stage change."""
+        self.run_report = run_report
+        self.on_update = on_update
+        self.jobs = []
+        self._in_flight = {}    # Job.key -> Job
+        self._fetches = {}      # Job.fetch_key -> SharedFetch
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="report")
+
+    def submit(self, topic, lang, depth, fmt, out_dir, force_refresh=False):
+        """Queues a report into out_dir. Returns (job, is_new): an identical
+        job still in flight is returned instead of queueing a second one."""
+        job = Job(topic, lang, depth, fmt, None, force_refresh)
+        with self._lock:
+            existing = self._in_flight.get(job.key)
+            if existing:
+                return existing, False
+            job.path = self._free_path(out_dir, job)
+            job.shared = self._fetches.setdefault(job.fetch_key, SharedFetch())
+            self._in_flight[job.key] = job
+            self.jobs.append(job)
+        self._notify(job)
+        self._pool.submit(self._run, job)
+        return job, True
+
+    def _free_path(self, out_dir, job):
+        # "<topic> - <language> <depth>.pdf", numbered if a running job already writes there
+        base = os.path.join(out_dir, f"{safe_filename(job.topic)} - {job.lang} {job.depth}")
+        taken = {j.path for j in self._in_flight.values()}
+        path, n = base + EXTENSIONS[job.fmt], 1
+        while path in taken:
+            n += 1
+            path = f"{base} {n}{EXTENSIONS[job.fmt]}"
+        return path
+
+    def _notify(self, job):
+        if self.on_update:
+            try:
+                self.on_update(job)
+            except Exception:
+                pass
+
+    def _progress(self, job):
+        def progress(event, span, active, done):
+            job.stage = ", ".join(active[:2]) if active else f"{done} stages done"
+            self._notify(job)
+        return progress
+
+    def _run(self, job):
+        job.started = time.monotonic()
+        if job.budget.cancelled:
+            self._finish(job, "cancelled")
+            return
+        job.budget.restart()  # Time spent waiting in the queue does not count
+        job.status = "running"
+        self._notify(job)
+        try:
+            self.run_report(job.topic, job.lang, job.depth, job.path, job.fmt, job.force_refresh,
+                            progress=self._progress(job), budget=job.budget, shared=job.shared)
+            job.missing = list(job.budget.missing)
+            self._finish(job, "partial" if job.missing else "done")
+        except ReportCancelled:
+            self._finish(job, "cancelled")
+        except Exception as e:
+            job.error = str(e)
+            self._finish(job, "failed")
+
+    def _finish(self, job, status):
+        job.status = status
+        job.stage = ""
+        job.finished = time.monotonic()
+        with self._lock:
+            self._in_flight.pop(job.key, None)
+            # Last job of this fetch gone: the next one fetches again (from the cache)
+            if not any(j.fetch_key == job.fetch_key for j in self._in_flight.values()):
+                self._fetches.pop(job.fetch_key, None)
+        self._notify(job)
+
+    def cancel_all(self):
+        with self._lock:
+            jobs = list(self._in_flight.values())
+        for job in jobs:
+            job.cancel()
+
+    def clear_finished(self):
+        with self._lock:
+            self.jobs = [j for j in self.jobs if j.status not in FINISHED]
+
+    def shutdown(self):
+        self.cancel_all()
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,184 @@
+"""
+Keyword analysis engine behind create_chart.
+- one precompiled tokenizer (letters only, 5+ characters, like before),
+  run once per distinct whitespace chunk instead of over the whole text
+- stopword tables per language, picked from the report's lang code
+- top-k with a heap instead of sorting every word
+- optional TF-IDF against the corpus of past reports, so the chart shows
+  terms that are distinctive for this topic and not just frequent ones.
+  The corpus is a small SQLite database (like the history), so batch worker
+  processes can add to it at the same time, and every document is only
+  counted once however many times its report is made again
+"""
+
+import hashlib
+import heapq
+import math
+import re
+import sqlite3
+import threading
+from collections import Counter
+
+TOKEN_RE = re.compile(r"\b[^\W\d_]{5,}\b")
+CORPUS_DB = "keyword_corpus.sqlite"
+MIN_CORPUS_DOCS = 5  # Below this TF-IDF is just noise, fall back to frequency
+
+STOPWORDS = {
+    "en": {
+        "about", "above", "after", "again", "against", "along", "also", "among", "because", "been", "before",
+        "being", "below", "between", "both", "cannot", "could", "does", "doing", "during", "each", "either",
+        "every", "first", "found", "from", "further", "have", "having", "here", "however", "including",
+        "into", "itself", "known", "later", "many", "might", "more", "most", "much", "must", "never", "often",
+        "other", "others", "ourselves", "over", "since", "should", "small", "some", "still", "such", "than",
+        "that", "their", "theirs", "them", "themselves", "then", "there", "these", "they", "thing", "things",
+        "this", "those", "through", "under", "until", "upon", "used", "using", "very", "well", "were", "what",
+        "when", "where", "whether", "which", "while", "whom", "whose", "will", "with", "within", "without",
+        "would", "years", "yourself", "yourselves",
+    },
+    "it": {
+        "abbiamo", "agli", "alla", "alle", "allo", "anche", "ancora", "avere", "aveva", "avevano",
+        "come", "comunque", "contro", "dalla", "dalle", "dallo", "degli", "della", "delle", "dello", "dentro",
+        "dopo", "dove", "essere", "erano", "fatto", "fino", "hanno", "inoltre", "invece", "loro", "mentre",
+        "molto", "molti", "negli", "nella", "nelle", "nello", "nostro", "ogni", "parte", "perché", "perche",
+        "però", "piuttosto", "poiché", "possono", "presso", "prima", "proprio", "quale", "quali", "quando",
+        "quanto", "quella", "quelle", "quelli", "quello", "questa", "queste", "questi", "questo", "secondo",
+        "sempre", "senza", "siano", "sono", "sopra", "sotto", "stata", "state", "stati", "stato", "stesso",
+        "sulla", "sulle", "sullo", "tanto", "tutta", "tutte", "tutti", "tutto", "venne", "viene", "vengono",
+    },
+    "fr": {
+        "ainsi", "alors", "après", "aussi", "autre", "autres", "avaient", "avait", "avant", "avec", "avoir",
+        "cette", "celle", "celui", "ceux", "comme", "comment", "dans", "depuis", "donc", "elles", "encore",
+        "entre", "étaient", "était", "être", "leurs", "lorsque", "mais", "même", "nous", "notre", "parce",
+        "peut", "plus", "plusieurs", "pour", "pourquoi", "quand", "quelle", "quelles", "quels", "selon",
+        "sont", "sous", "toute", "toutes", "tous", "très", "vers", "votre",
+    },
+    "es": {
+        "además", "ahora", "antes", "aquel", "aquella", "bajo", "cada", "cierto", "como", "contra", "cuando",
+        "desde", "donde", "durante", "ellos", "ellas", "entre", "estaba", "estado", "estas", "estos", "fueron",
+        "había", "hasta", "hacia", "mientras", "mismo", "mucho", "muchos", "nuestro", "otras", "otros",
+        "para", "porque", "puede", "pueden", "según", "siendo", "sobre", "también", "tanto", "tiene",
+        "tienen", "todas", "todos", "través", "usted",
+    },
+    "de": {
+        "aber", "allem", "allen", "aller", "alles", "andere", "anderen", "auch", "bereits", "damit", "dann",
+        "darauf", "dass", "denen", "derem", "deren", "dessen", "diese", "diesem", "diesen", "dieser",
+        "dieses", "durch", "einem", "einen", "einer", "eines", "etwas", "gegen", "haben", "hatte", "hatten",
+        "immer", "jedoch", "jetzt", "kann", "können", "konnte", "mehr", "nach", "nicht", "noch", "oder",
+        "schon", "sehr", "seine", "seinem", "seinen", "seiner", "sich", "sind", "sowie", "über", "unter",
+        "welche", "welcher", "werden", "wieder", "wird", "wurde", "wurden", "zwischen",
+    },
+}
+
+
+def stopwords_for(lang):
+    # Web results are often English whatever the report language
+    return STOPWORDS.get(lang, set()) | STOPWORDS["en"]
+
+
+def term_counts(text, lang="en"):
+    # Splitting on whitespace and counting in C is much faster than running
+    # the regex over the whole text; the regex then only sees the (few)
+    # distinct chunks that carry punctuation, like "word," or "l'acqua"
+    counts = Counter()
+    for chunk, n in Counter(text.lower().split()).items():
+        if chunk.isalpha():
+            if len(chunk) >= 5:
+                counts[chunk] += n
+        else:
+            for word in TOKEN_RE.findall(chunk):
+                counts[word] += n
+    # Deleting the (few) stopwords from the counter is much cheaper
+    # than testing every single token against the table
+    for word in stopwords_for(lang):
+        counts.pop(word, None)
+    return counts
+
+
+def top_terms(text, lang="en", k=7):
+    """Most frequent k terms as (word, count), highest first."""
+    counts = term_counts(text, lang)
+    return heapq.nlargest(k, counts.items(), key=lambda item: item[1])
+
+
+class KeywordCorpus:
+    """Document frequencies of past reports, per language."""
+
+    def __init__(self, path=CORPUS_DB):
+        self.path = path
+        self._lock = threading.Lock()
+        # Autocommit mode: transactions are opened explicitly below
+        self._db = sqlite3.connect(path, timeout=10, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS docs (lang TEXT NOT NULL, doc_key TEXT NOT NULL, PRIMARY KEY (lang, doc_key));
+            CREATE TABLE IF NOT EXISTS df (
+                lang TEXT NOT NULL,
+                word TEXT NOT NULL,
+                n INTEGER NOT NULL,
+                PRIMARY KEY (lang, word)
+            );
+        """)
+
+    def docs(self, lang):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM docs WHERE lang=?", (lang,)).fetchone()[0]
+
+    def add(self, counts, lang, doc_key):
+        """Counts the words of one document. Returns False (and changes
+        nothing) if a document with this key was already added."""
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                added = self._db.execute("INSERT OR IGNORE INTO docs VALUES (?, ?)", (lang, doc_key)).rowcount
+                if added:
+                    self._db.executemany(
+                        "INSERT INTO df VALUES (?, ?, 1) ON CONFLICT (lang, word) DO UPDATE SET n = n + 1",
+                        ((lang, word) for word in counts))
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+        return bool(added)
+
+    def _frequencies(self, words, lang):
+        df = {}
+        for i in range(0, len(words), 500):  # Stay under SQLite's limit on parameters
+            batch = words[i:i + 500]
+            marks = ",".join("?" * len(batch))
+            df.update(self._db.execute(f"SELECT word, n FROM df WHERE lang=? AND word IN ({marks})",
+                                       [lang] + batch).fetchall())
+        return df
+
+    def tfidf_top(self, counts, lang, k=7):
+        """Top k (word, score) by TF-IDF against this corpus."""
+        with self._lock:
+            n = self._db.execute("SELECT COUNT(*) FROM docs WHERE lang=?", (lang,)).fetchone()[0]
+            df = self._frequencies(list(counts), lang)
+        scored = ((word, tf * (math.log((1 + n) / (1 + df.get(word, 0))) + 1)) for word, tf in counts.items())
+        return heapq.nlargest(k, scored, key=lambda item: item[1])
+
+
+_corpus = None
+_corpus_lock = threading.Lock()
+
+
+def get_corpus():
+    global _corpus
+    with _corpus_lock:
+        if _corpus is None:
+            _corpus = KeywordCorpus()
+        return _corpus
+
+
+def analyze(text, lang="en", k=7, corpus=None, learn=True):
+    """Returns (mode, [(word, score), ...]) where mode is 'tfidf' or 'frequency'.
+    With learn=True the text is added to the corpus afterwards, unless the
+    same text (e.g. a cached report made again) was added before."""
+    counts = term_counts(text, lang)
+    if corpus is not None and corpus.docs(lang) >= MIN_CORPUS_DOCS:
+        mode, top = "tfidf", corpus.tfidf_top(counts, lang, k)
+    else:
+        mode, top = "frequency", heapq.nlargest(k, counts.items(), key=lambda item: item[1])
+    if corpus is not None and learn and counts:
+        corpus.add(counts, lang, hashlib.sha1(text.encode("utf-8")).hexdigest())
+    return mode, top
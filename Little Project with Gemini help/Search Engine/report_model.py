@@ -0,0 +1,218 @@
+"""
+Intermediate report model.
+A Report holds everything generate_report collected (summary, web results,
+cover image, chart, what was missing) independently of the output format.
+It is saved as a small zip next to the history entry (report.json deflated,
+images stored as they are, since they are already compressed), so a report
+can be exported again to PDF, Word or any registered format without any
+network I/O. A Report is never modified after it is built, so several
+exports can render from the same object at the same time.
+
+Exporters register themselves with @exporter(format_name, extension).
+The PDF and Word ones live in exporters.py, which is only imported the
+first time one of them is used (fpdf and python-docx are slow to load).
+
+    python report_model.py report_data/<id>.report out.pdf out.docx out.html
+"""
+
+import base64
+import datetime
+import hashlib
+import html
+import importlib
+import json
+import os
+import sys
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+REPORT_DIR = "report_data"
+VERSION = 1
+
+EXPORTERS = {}  # format name -> (function(report, save_path), extension)
+# Registered by their module on first use: format name -> (module, extension)
+LAZY_EXPORTERS = {"PDF": ("exporters", ".pdf"), "Word (.docx)": ("exporters", ".docx")}
+
+
+def exporter(fmt, ext):
+    def register(fn):
+        EXPORTERS[fmt] = (fn, ext)
+        return fn
+    return register
+
+
+def formats():
+    """Every known format name -> extension, without importing any exporter."""
+    known = {fmt: ext for fmt, (_, ext) in LAZY_EXPORTERS.items()}
+    known.update({fmt: ext for fmt, (_, ext) in EXPORTERS.items()})
+    return known
+
+
+def extension(fmt):
+    return formats()[fmt]
+
+
+def format_for_path(path):
+    ext = os.path.splitext(path)[1].lower()
+    for fmt, fmt_ext in formats().items():
+        if fmt_ext == ext:
+            return fmt
+    raise ValueError(f"No exporter for '{ext}' files.")
+
+
+def get_exporter(fmt):
+    if fmt not in EXPORTERS and fmt in LAZY_EXPORTERS:
+        importlib.import_module(LAZY_EXPORTERS[fmt][0])
+    try:
+        return EXPORTERS[fmt][0]
+    except KeyError:
+        raise ValueError(f"Unknown format: {fmt}")
+
+
+class Report:
+    def __init__(self, topic, lang, depth, wiki_summary, web_results, img_data=None, chart_data=None,
+                 missing=None, created=None, sections=None):
+        self.topic = topic
+        self.lang = lang
+        self.depth = depth
+        self.wiki_summary = wiki_summary
+        self.web_results = [dict(r) for r in web_results]
+        self.img_data = img_data
+        self.chart_data = chart_data
+        self.missing = list(missing or [])
+        self.created = created or datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        # Combined multi-language report: [{"lang": ..., "summary": ...}] in order
+        self.sections = [dict(sec) for sec in sections] if sections else None
+
+    @property
+    def id(self):
+        # Same content -> same file, so jobs sharing one fetch store it once
+        h = hashlib.sha1(f"{self.topic}\0{self.lang}\0{self.depth}\0{self.created}".encode("utf-8"))
+        for _, summary in self.summaries:
+            h.update(summary.encode("utf-8"))
+        for res in self.web_results:
+            h.update(res['href'].encode("utf-8"))
+        return h.hexdigest()[:16]
+
+    @property
+    def note(self):
+        # Out of time: the export says what is missing
+        if self.missing:
+            return f"Partial report: {', '.join(self.missing)} did not arrive in time."
+        return None
+
+    @property
+    def summaries(self):
+        """[(language, summary)]: one per section, or just the report's own."""
+        if self.sections:
+            return [(sec["lang"], sec["summary"]) for sec in self.sections]
+        return [(self.lang, self.wiki_summary)]
+
+    @property
+    def full_text(self):
+        return " ".join([summary for _, summary in self.summaries] + [res['body'] for res in self.web_results])
+
+    # --- Storage ---
+    def save(self, folder=REPORT_DIR):
+        """Writes <folder>/<id>.report (once) and returns its path."""
+        os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, self.id + ".report")
+        if os.path.exists(path):
+            return path
+        meta = {
+            "version": VERSION, "topic": self.topic, "lang": self.lang, "depth": self.depth,
+            "created": self.created, "wiki_summary": self.wiki_summary,
+            "web_results": self.web_results, "missing": self.missing,
+        }
+        if self.sections:
+            meta["sections"] = self.sections
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"  # Jobs sharing a fetch may save together
+        with zipfile.ZipFile(tmp, "w") as z:
+            z.writestr("report.json", json.dumps(meta, ensure_ascii=False), zipfile.ZIP_DEFLATED)
+            if self.img_data:
+                z.writestr("cover.jpg", self.img_data, zipfile.ZIP_STORED)
+            if self.chart_data:
+                z.writestr("chart.png", self.chart_data, zipfile.ZIP_STORED)
+        os.replace(tmp, path)
+        return path
+
+    @classmethod
+    def load(cls, path):
+        with zipfile.ZipFile(path) as z:
+            names = set(z.namelist())
+            meta = json.loads(z.read("report.json").decode("utf-8"))
+            img_data = z.read("cover.jpg") if "cover.jpg" in names else None
+            chart_data = z.read("chart.png") if "chart.png" in names else None
+        if meta.get("version", 1) > VERSION:
+            raise ValueError("This report was saved by a newer version.")
+        return cls(meta["topic"], meta["lang"], meta["depth"], meta["wiki_summary"], meta["web_results"],
+                   img_data, chart_data, meta.get("missing"), meta.get("created"), meta.get("sections"))
+
+    # --- Export ---
+    def export(self, save_path, fmt=None):
+        fmt = fmt or format_for_path(save_path)
+        get_exporter(fmt)(self, save_path)
+        return save_path
+
+
+def combine(reports, chart_data=None):
+    """One report with a section per language, from single-language reports
+    of the same topic (they share the web results)."""
+    first = reports[0]
+    missing = []
+    for r in reports:
+        missing += [m for m in r.missing if m not in missing]
+    img_data = next((r.img_data for r in reports if r.img_data), None)
+    return Report(first.topic, " + ".join(r.lang for r in reports), first.depth, first.wiki_summary,
+                  first.web_results, img_data, chart_data if chart_data is not None else first.chart_data,
+                  missing, first.created, [{"lang": r.lang, "summary": r.wiki_summary} for r in reports])
+
+
+def export_all(report, targets, workers=None):
+    """Renders one report to many (save_path, fmt) targets in parallel.
+    Returns {save_path: None or the exception it raised}."""
+    results = {}
+    with ThreadPoolExecutor(max_workers=workers or len(targets) or 1) as pool:
+        futures = {pool.submit(report.export, path, fmt): path for path, fmt in targets}
+        for future, path in futures.items():
+            results[path] = future.exception()
+    return results
+
+
+@exporter("HTML (.html)", ".html")
+def export_html(report, save_path):
+    # Single file: the images are embedded as data URIs
+    def img(data, mime, width):
+        b64 = base64.b64encode(data).decode("ascii")
+        return f'<img src="data:{mime};base64,{b64}" style="max-width:{width}">'
+
+    e = html.escape
+    parts = [f"<!DOCTYPE html><html><head><meta charset='utf-8'><title>Report: {e(report.topic)}</title></head><body>",
+             f"<h1>Report: {e(report.topic)}</h1>", f"<p>Generated on: {e(report.created[:10])}</p>"]
+    if report.note:
+        parts.append(f"<p><i>{e(report.note)}</i></p>")
+    if report.img_data:
+        parts.append(img(report.img_data, "image/jpeg", "4in"))
+    for lang, summary in report.summaries:
+        parts.append(f"<h2>Overview ({e(lang)})</h2><p>{e(summary)}</p>")
+    if report.chart_data:
+        parts += ["<h2>Semantic Analysis</h2>", img(report.chart_data, "image/png", "5in")]
+    if report.web_results:
+        parts.append("<h2>Web Resources</h2>")
+        for res in report.web_results:
+            parts.append(f"<h3>{e(res['title'])}</h3><p>{e(res['body'])}</p>"
+                         f"<p><a href=\"{e(res['href'])}\">{e(res['href'])}</a></p>")
+    parts.append("</body></html>")
+    with open(save_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(parts))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        sys.exit("Usage: python report_model.py <saved .report> <output file>...")
+    import report_model  # The module exporters register with (this one runs as __main__)
+    saved = report_model.Report.load(sys.argv[1])
+    targets = [(p, report_model.format_for_path(p)) for p in sys.argv[2:]]
+    for path, error in report_model.export_all(saved, targets).items():
+        print(f"{path}: {error or 'ok'}")
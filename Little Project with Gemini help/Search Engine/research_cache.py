@@ -0,0 +1,139 @@
+"""
+Persistent research cache.
+Stores what generate_report fetches (Wikipedia summaries, images, DDGS
+results, scraped pages) in a small SQLite file, keyed on
+(source, topic, language, depth). Every source has its own TTL and the
+whole file is kept under a size cap by evicting the least recently used
+entries.
+"""
+
+import pickle
+import sqlite3
+import threading
+import time
+
+CACHE_FILE = "research_cache.sqlite"
+MAX_BYTES = 200 * 1024 * 1024  # 200 MB
+
+DAY = 24 * 60 * 60
+TTLS = {
+    "wiki_summary": 7 * DAY,
+    "wiki_image": 30 * DAY,
+    "ddgs": 1 * DAY,
+    "scrape": 2 * DAY,
+}
+DEFAULT_TTL = 1 * DAY
+
+_MISS = object()
+
+
+class ResearchCache:
+    def __init__(self, path=CACHE_FILE, max_bytes=MAX_BYTES, ttls=None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttls = dict(TTLS, **(ttls or {}))
+        self.hits = {}
+        self.misses = {}
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                source TEXT, topic TEXT, lang TEXT, depth TEXT,
+                value BLOB, size INTEGER, created REAL, last_used REAL,
+                PRIMARY KEY (source, topic, lang, depth)
+            )""")
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_last_used ON entries (last_used)")
+        self._db.commit()
+
+    @staticmethod
+    def _key(source, topic, lang, depth):
+        return (source, str(topic).strip().lower(), str(lang or ""), str(depth or ""))
+
+    def get(self, source, topic, lang="", depth="", default=None):
+        key = self._key(source, topic, lang, depth)
+        ttl = self.ttls.get(source, DEFAULT_TTL)
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value, created FROM entries WHERE source=? AND topic=? AND lang=? AND depth=?", key
+            ).fetchone()
+            if row is None or now - row[1] > ttl:
+                self.misses[source] = self.misses.get(source, 0) + 1
+                return default
+            self._db.execute(
+                "UPDATE entries SET last_used=? WHERE source=? AND topic=? AND lang=? AND depth=?", (now,) + key
+            )
+            self._db.commit()
+            self.hits[source] = self.hits.get(source, 0) + 1
+        return pickle.loads(row[0])
+
+    def put(self, source, topic, value, lang="", depth=""):
+        key = self._key(source, topic, lang, depth)
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                key + (blob, len(blob), now, now),
+            )
+            self._evict()
+            self._db.commit()
+
+    def _evict(self):
+        # Drop least recently used entries until we are back under the cap
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._db.execute("SELECT rowid, size FROM entries ORDER BY last_used").fetchall()
+        doomed = []
+        for rowid, size in rows:
+            if total <= self.max_bytes:
+                break
+            doomed.append((rowid,))
+            total -= size
+        self._db.executemany("DELETE FROM entries WHERE rowid=?", doomed)
+
+    def fetch(self, source, topic, loader, lang="", depth="", force=False, keep=bool):
+        """Returns the cached value, or calls loader() and stores its result.
+        force=True skips the lookup (but still refreshes the entry).
+        keep decides whether a fresh value is worth caching (failures are not)."""
+        if not force:
+            value = self.get(source, topic, lang, depth, default=_MISS)
+            if value is not _MISS:
+                return value
+        value = loader()
+        if keep(value):
+            self.put(source, topic, value, lang, depth)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM entries")
+            self._db.commit()
+
+    def stats(self):
+        with self._lock:
+            entries, size = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        hits = sum(self.hits.values())
+        misses = sum(self.misses.values())
+        return {
+            "entries": entries,
+            "bytes": size,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            "by_source": {s: {"hits": self.hits.get(s, 0), "misses": self.misses.get(s, 0)}
+                          for s in set(self.hits) | set(self.misses)},
+        }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResearchCache()
+        return _cache
@@ -0,0 +1,100 @@
+"""
+Text sanitization shared by the PDF and DOCX exporters.
+- clean_text: for FPDF core fonts (latin-1 only). The replacement table
+  is split by what each entry needs:
+  - characters outside latin-1 (typographic quotes, dashes, '€') are
+    handled by the error handler of the one latin-1 encode, which also
+    folds whatever the table missed (NFKD, accents dropped, else '?')
+  - latin-1 characters mapped to one character ('à' -> 'a') go through a
+    256-byte bytes.translate table on the encoded text
+  - the few latin-1 characters mapped to several ('ß' -> 'ss') are the
+    only ones left to a regex, run before the encode
+  str.translate with a dict was measured ~10x slower than all of this on
+  long non-ASCII text: it looks every character up in the dict.
+  Pure ASCII is returned as is.
+- clean_xml_text: for python-docx, which rejects XML control characters.
+Short strings (titles, links) are memoized.
+"""
+
+import codecs
+import re
+import unicodedata
+from functools import lru_cache
+
+MEMO_MAX_LEN = 256
+
+# Same replacements clean_text always had, plus a few common web characters
+REPLACEMENTS = {
+    '€': 'EUR', '”': '"', '“': '"', '’': "'", '‘': "'", '–': '-', '…': '...',
+    'à': 'a', 'è': 'e', 'é': 'e', 'ì': 'i', 'ò': 'o', 'ù': 'u',
+    'Á': 'A', 'É': 'E', 'Í': 'I', 'Ó': 'O', 'Ú': 'U',
+    'ä': 'a', 'ö': 'o', 'ü': 'u', 'ß': 'ss', 'ñ': 'n',
+    '—': '-', '•': '-', '„': '"', '\u200b': '', '\ufeff': '',
+}
+
+def _is_latin1(ch):
+    return ord(ch) < 256
+
+
+# Latin-1 characters replaced by exactly one character: a byte table applied after the encode
+BYTE_TABLE = bytes.maketrans(
+    "".join(k for k, v in REPLACEMENTS.items() if _is_latin1(k) and len(v) == 1).encode("latin-1"),
+    "".join(v for k, v in REPLACEMENTS.items() if _is_latin1(k) and len(v) == 1).encode("latin-1"))
+# Latin-1 characters replaced by something longer or empty: the only ones left to a regex
+MULTI = {k: v for k, v in REPLACEMENTS.items() if _is_latin1(k) and len(v) != 1}
+MULTI_PATTERN = re.compile("[" + "".join(re.escape(c) for c in MULTI) + "]")
+
+
+def _replace_multi(match):
+    return MULTI[match.group()]
+
+# XML 1.0 forbids C0 controls other than tab, newline and carriage return
+XML_TABLE = str.maketrans({c: None for c in range(32) if c not in (9, 10, 13)})
+XML_TABLE.update({0xFFFE: None, 0xFFFF: None})
+
+
+@lru_cache(maxsize=4096)
+def _fold_char(ch):
+    decomposed = unicodedata.normalize("NFKD", ch)
+    folded = "".join(c for c in decomposed if not unicodedata.combining(c))
+    try:
+        folded.encode("latin-1")
+        return folded or "?"
+    except UnicodeEncodeError:
+        return "?"
+
+
+@lru_cache(maxsize=4096)
+def _fold_run(run):
+    # Only characters outside latin-1 get here: the table first, then folding
+    return "".join(REPLACEMENTS[ch] if ch in REPLACEMENTS else _fold_char(ch) for ch in run)
+
+
+def _latin1_fallback(err):
+    return _fold_run(err.object[err.start:err.end]), err.end
+
+
+codecs.register_error("sanitize.latin1", _latin1_fallback)
+
+
+def _clean(text):
+    if text.isascii():
+        return text
+    if MULTI:
+        text = MULTI_PATTERN.sub(_replace_multi, text)
+    return text.encode("latin-1", "sanitize.latin1").translate(BYTE_TABLE).decode("latin-1")
+
+
+_clean_short = lru_cache(maxsize=8192)(_clean)
+
+
+def clean_text(text):
+    if not text: return ""
+    if len(text) <= MEMO_MAX_LEN:
+        return _clean_short(text)
+    return _clean(text)
+
+
+def clean_xml_text(text):
+    if not text: return ""
+    return text.translate(XML_TABLE)
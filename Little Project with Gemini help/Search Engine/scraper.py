@@ -0,0 +1,92 @@
+"""
+Streaming paragraph extraction.
+Reads an HTTP response in chunks and feeds them to an incremental HTML
+parser, stopping as soon as enough <p> text has been collected, so heavy
+pages are never fully downloaded or parsed.
+"""
+
+import codecs
+from html.parser import HTMLParser
+
+CHUNK_SIZE = 16 * 1024
+MAX_BYTES = 512 * 1024          # Hard cap on what we read from one page
+HTML_TYPES = ("text/html", "application/xhtml+xml")
+
+
+class ParagraphExtractor(HTMLParser):
+    """Collects the text of the first `max_paragraphs` <p> tags,
+    or until `max_chars` characters have been gathered."""
+
+    def __init__(self, max_paragraphs=3, max_chars=400):
+        super().__init__()
+        self.max_paragraphs = max_paragraphs
+        self.max_chars = max_chars
+        self.paragraphs = []
+        self.chars = 0
+        self._current = None
+
+    @property
+    def done(self):
+        return len(self.paragraphs) >= self.max_paragraphs or self.chars > self.max_chars
+
+    def _close_paragraph(self):
+        if self._current is not None:
+            self.paragraphs.append("".join(self._current))
+            self._current = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "p":
+            # <p> cannot nest: a new one closes the previous
+            self._close_paragraph()
+            if not self.done:
+                self._current = []
+
+    def handle_endtag(self, tag):
+        if tag in ("p", "body", "html"):
+            self._close_paragraph()
+
+    def handle_data(self, data):
+        if self._current is not None:
+            self._current.append(data)
+            self.chars += len(data)
+
+    def text(self):
+        parts = self.paragraphs[:self.max_paragraphs]
+        if self._current is not None and len(parts) < self.max_paragraphs:
+            parts = parts + ["".join(self._current)]
+        return " ".join(parts)
+
+
+def is_html(response):
+    content_type = response.headers.get("Content-Type", "")
+    return not content_type or content_type.split(";")[0].strip().lower() in HTML_TYPES
+
+
+def _decoder(response):
+    # Without an explicit charset requests assumes latin-1; most pages are utf-8
+    encoding = response.encoding if "charset" in response.headers.get("Content-Type", "").lower() else "utf-8"
+    try:
+        return codecs.getincrementaldecoder(encoding or "utf-8")(errors="replace")
+    except LookupError:
+        return codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+
+def stream_paragraphs(response, max_paragraphs=3, max_chars=400, max_bytes=MAX_BYTES, should_stop=None):
+    """Returns (text, bytes_read) from a response opened with stream=True.
+    should_stop() is checked between chunks (cancel / out of time).
+    The response is always closed, even when we stop early."""
+    extractor = ParagraphExtractor(max_paragraphs, max_chars)
+    read = 0
+    try:
+        decoder = _decoder(response)
+        for chunk in response.iter_content(CHUNK_SIZE):
+            read += len(chunk)
+            extractor.feed(decoder.decode(chunk))
+            if extractor.done or read >= max_bytes or (should_stop and should_stop()):
+                break
+        else:
+            extractor.feed(decoder.decode(b"", final=True))
+            extractor.close()
+    finally:
+        response.close()
+    return extractor.text(), read
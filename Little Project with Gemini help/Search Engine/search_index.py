@@ -0,0 +1,372 @@
+"""
+Local full-text search over everything generate_report collected
+(Wikipedia summary, scraped bodies, DDGS titles and links).
+
+The index is an inverted index split in immutable segments: every
+finished report adds one small segment, and whenever MERGE_FACTOR
+segments of the same size class pile up at the tail they are merged
+into one (like a binary counter), so each document is rewritten only
+O(log n) times. Posting lists are flat uint32
+(doc_id, tf) pairs read through mmap, so searching never loads them into
+Python objects. Ranking is BM25. No network is involved.
+
+Layout of the index directory:
+    manifest.json    segments (+ docs per segment), doc count, total length
+                     (replaced atomically)
+    docs.jsonl       one line of metadata per document (append only)
+    seg_<n>.terms    JSON: term -> [offset, count]
+    seg_<n>.post     (doc_id, tf) uint32 pairs
+
+    python search_index.py "query words"
+"""
+
+import array
+import heapq
+import json
+import math
+import mmap
+import os
+import re
+import sys
+import threading
+import time
+import unicodedata
+from collections import Counter
+
+INDEX_DIR = "search_index"
+MERGE_FACTOR = 4
+K1 = 1.2
+B = 0.75
+SNIPPET_CHARS = 200
+REFRESH_RETRIES = 5  # Reloads of the manifest when a segment it lists was merged away meanwhile
+
+TOKEN_RE = re.compile(r"\w+")
+COMBINING_RE = re.compile("[\u0300-\u036f]+")
+SEGMENT_FILE_RE = re.compile(r"(seg_\d+)\.(?:post|terms)$")
+
+
+def tokenize(text):
+    # Lowercase and drop accents, so "citta" also finds "città"
+    text = COMBINING_RE.sub("", unicodedata.normalize("NFKD", text.lower()))
+    return TOKEN_RE.findall(text)
+
+
+class _FileLock:
+    """Cross-process lock (batch workers write to the same index)."""
+
+    def __init__(self, path, timeout=10, stale_after=30):
+        self.path = path
+        self.timeout = timeout
+        self.stale_after = stale_after
+        self.fd = None
+        self._touched = 0.0
+
+    def touch(self):
+        """Tells the other processes the holder is still alive (long merges):
+        refreshes the lock file's mtime, at most once a second."""
+        now = time.monotonic()
+        if now - self._touched >= 1:
+            self._touched = now
+            try:
+                os.utime(self.path)
+            except OSError:
+                pass
+
+    def __enter__(self):
+        deadline = time.time() + self.timeout
+        while True:
+            try:
+                self.fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                return self
+            except FileExistsError:
+                try:
+                    # A writer that crashed leaves the lock behind
+                    if time.time() - os.path.getmtime(self.path) > self.stale_after:
+                        os.remove(self.path)
+                        continue
+                except OSError:
+                    pass
+                if time.time() > deadline:
+                    raise TimeoutError("The search index is locked by another process.")
+                time.sleep(0.05)
+
+    def __exit__(self, *exc):
+        os.close(self.fd)
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+class _Segment:
+    def __init__(self, base):
+        with open(base + ".terms", "r", encoding="utf-8") as f:
+            self.terms = json.load(f)
+        self._file = open(base + ".post", "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._ints = memoryview(self._mmap).cast("I")
+
+    def postings(self, term):
+        """Flat (doc_id, tf, doc_id, tf, ...) view, without copying."""
+        loc = self.terms.get(term)
+        if not loc:
+            return self._ints[0:0]
+        offset, count = loc
+        return self._ints[offset:offset + 2 * count]
+
+    def postings_list(self, term):
+        p = self.postings(term)
+        try:
+            return p.tolist()
+        finally:
+            p.release()
+
+    def close(self):
+        self._ints.release()
+        self._mmap.close()
+        self._file.close()
+
+
+class SearchIndex:
+    def __init__(self, path=INDEX_DIR):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self._lock = threading.Lock()
+        self._segments = {}     # name -> _Segment
+        self._manifest = None
+        self._manifest_stamp = None
+        self.docs = {}          # doc_id -> metadata
+        self._docs_offset = 0
+
+    # --- Files ---
+    def _file(self, name):
+        return os.path.join(self.path, name)
+
+    def _read_manifest(self):
+        try:
+            with open(self._file("manifest.json"), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"segments": [], "segment_docs": {}, "next_segment": 1, "next_doc": 1, "docs": 0, "total_length": 0}
+
+    def _write_manifest(self, manifest):
+        tmp = self._file("manifest.json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        os.replace(tmp, self._file("manifest.json"))
+
+    def _write_segment(self, name, postings, heartbeat=None):
+        """postings: term -> [(doc_id, tf), ...] in doc_id order.
+        heartbeat() is called as it goes (keeps the file lock fresh)."""
+        data = array.array("I")
+        terms = {}
+        for term in sorted(postings):
+            if heartbeat: heartbeat()
+            plist = postings[term]
+            terms[term] = [len(data), len(plist)]
+            for doc_id, tf in plist:
+                data.append(doc_id)
+                data.append(min(tf, 0xFFFFFFFF))
+        with open(self._file(name + ".post"), "wb") as f:
+            data.tofile(f)
+        with open(self._file(name + ".terms"), "w", encoding="utf-8") as f:
+            json.dump(terms, f, ensure_ascii=False, separators=(",", ":"))
+
+    def _remove_unreferenced_segments(self, manifest):
+        """Deletes the files of every segment the manifest no longer lists:
+        the ones just merged, and any an earlier merge could not delete."""
+        wanted = set(manifest["segments"])
+        for file_name in os.listdir(self.path):
+            m = SEGMENT_FILE_RE.match(file_name)
+            if m and m.group(1) not in wanted:
+                try:
+                    os.remove(self._file(file_name))
+                except OSError:
+                    pass  # Still mapped by another process (Windows): the next merge retries
+
+    # --- Reading ---
+    def _stamp(self):
+        try:
+            st = os.stat(self._file("manifest.json"))
+            return st.st_mtime_ns, st.st_size
+        except OSError:
+            return None
+
+    def _refresh(self):
+        """Picks up segments and documents written since the last call (by us or other processes)."""
+        stamp = self._stamp()
+        for attempt in range(REFRESH_RETRIES):
+            if stamp == self._manifest_stamp and self._manifest is not None:
+                break
+            manifest = self._read_manifest()
+            try:
+                self._open_segments(manifest["segments"])
+            except FileNotFoundError:
+                # Another process merged a segment away after we read the manifest:
+                # its new manifest is (about to be) written, read that one
+                if attempt == REFRESH_RETRIES - 1:
+                    raise
+                time.sleep(0.05 * (attempt + 1))
+                stamp = self._stamp()
+                continue
+            # Only now: a stamp set before every segment opened would stop the retries
+            self._manifest, self._manifest_stamp = manifest, stamp
+            break
+
+        try:
+            with open(self._file("docs.jsonl"), "r", encoding="utf-8") as f:
+                f.seek(self._docs_offset)
+                for line in iter(f.readline, ""):
+                    if not line.endswith("\n"):
+                        break  # Being written right now
+                    doc = json.loads(line)
+                    self.docs[doc["id"]] = doc
+                    self._docs_offset = f.tell()
+        except OSError:
+            pass
+
+    def _open_segments(self, names):
+        """Makes self._segments hold exactly names. Opens every new one first,
+        so on error nothing changes."""
+        opened = {}
+        try:
+            for name in names:
+                if name not in self._segments and name not in opened:
+                    opened[name] = _Segment(self._file(name))
+        except:
+            for seg in opened.values():
+                seg.close()
+            raise
+        wanted = set(names)
+        for name in list(self._segments):
+            if name not in wanted:
+                self._segments.pop(name).close()
+        self._segments.update(opened)
+
+    def search(self, query, k=10):
+        """BM25 top k as a list of document metadata dicts with a 'score'."""
+        terms = set(tokenize(query))
+        with self._lock:
+            self._refresh()
+            n = self._manifest["docs"]
+            if not terms or not n:
+                return []
+            avgdl = self._manifest["total_length"] / n
+            segments = [self._segments[name] for name in self._manifest["segments"]]
+            scores = {}
+            for term in terms:
+                plists = [seg.postings(term) for seg in segments]
+                df = sum(len(p) for p in plists) // 2
+                if not df:
+                    continue
+                idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+                for p in plists:
+                    it = iter(p)
+                    for doc_id, tf in zip(it, it):
+                        doc = self.docs.get(doc_id)
+                        dl = doc["length"] if doc else avgdl
+                        norm = K1 * (1 - B + B * dl / avgdl)
+                        scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (K1 + 1) / (tf + norm)
+            top = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+            return [dict(self.docs[d], score=round(s, 3)) for d, s in top if d in self.docs]
+
+    # --- Writing ---
+    def add(self, text, **meta):
+        """Indexes one document. meta (topic, path, date, ...) is returned by search()."""
+        counts = Counter(tokenize(text))
+        if not counts:
+            return None
+        with self._lock, _FileLock(self._file(".lock")) as lock:
+            manifest = self._read_manifest()
+            doc_id = manifest["next_doc"]
+            name = f"seg_{manifest['next_segment']}"
+            length = sum(counts.values())
+            # Segment and document first: until the manifest lists them they are invisible
+            self._write_segment(name, {term: [(doc_id, tf)] for term, tf in counts.items()})
+            doc = dict(meta, id=doc_id, length=length)
+            with open(self._file("docs.jsonl"), "a", encoding="utf-8") as f:
+                f.write(json.dumps(doc, ensure_ascii=False) + "\n")
+
+            manifest["next_doc"] += 1
+            manifest["next_segment"] += 1
+            manifest["segments"].append(name)
+            manifest["segment_docs"][name] = 1
+            manifest["docs"] += 1
+            manifest["total_length"] += length
+            merged = False
+            while self._tail_to_merge(manifest):
+                self._merge(manifest, manifest["segments"][-MERGE_FACTOR:], lock.touch)
+                merged = True
+            self._write_manifest(manifest)
+            if merged:
+                # Only once the new manifest no longer points at them
+                self._remove_unreferenced_segments(manifest)
+        return doc_id
+
+    @staticmethod
+    def _tail_to_merge(manifest):
+        tail = manifest["segments"][-MERGE_FACTOR:]
+        if len(tail) < MERGE_FACTOR:
+            return False
+        level = lambda name: int(math.log(manifest["segment_docs"][name], MERGE_FACTOR) + 1e-9)
+        return len({level(name) for name in tail}) == 1
+
+    def _merge(self, manifest, old, heartbeat=None):
+        readers = [_Segment(self._file(name)) for name in old]
+        merged = {}
+        try:
+            # Segments are in doc_id order, so appending keeps posting lists sorted
+            for seg in readers:
+                for term in seg.terms:
+                    if heartbeat: heartbeat()
+                    flat = seg.postings_list(term)
+                    merged.setdefault(term, []).extend(zip(flat[0::2], flat[1::2]))
+            name = f"seg_{manifest['next_segment']}"
+            manifest["next_segment"] += 1
+            self._write_segment(name, merged, heartbeat)
+        finally:
+            for seg in readers:
+                seg.close()
+        manifest["segments"] = manifest["segments"][:-len(old)] + [name]
+        manifest["segment_docs"][name] = sum(manifest["segment_docs"].pop(seg_name) for seg_name in old)
+        # Our own maps of the old segments must go before the files can be removed
+        for seg_name in old:
+            if seg_name in self._segments:
+                self._segments.pop(seg_name).close()
+        self._manifest_stamp = None
+
+    def close(self):
+        with self._lock:
+            for seg in self._segments.values():
+                seg.close()
+            self._segments.clear()
+            self._manifest_stamp = None
+
+
+def snippet(text):
+    text = " ".join(text.split())
+    return text if len(text) <= SNIPPET_CHARS else text[:SNIPPET_CHARS] + "..."
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = SearchIndex()
+        return _index
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        sys.exit('Usage: python search_index.py "query words"')
+    start = time.perf_counter()
+    results = get_index().search(" ".join(sys.argv[1:]))
+    elapsed = (time.perf_counter() - start) * 1000
+    for r in results:
+        print(f"{r['score']:>7} [{r.get('date', '')}] {r.get('topic', '')} -> {r.get('path', '')}")
+        print(f"        {r.get('snippet', '')}")
+    print(f"{len(results)} results in {elapsed:.1f} ms")
@@ -0,0 +1,55 @@
+"""
+Wikipedia lookups through the shared HTTP session (http_client).
+Every language is its own site, https://<code>.wikipedia.org, and each call
+names its language: nothing global like wikipedia.set_lang is involved, so
+lookups in different languages, and of different reports, run in parallel.
+- summary: the first sentences of the best match for a topic, in plain text
+- image_urls: the URLs of the images on that article
+Like the wikipedia module, the best match is the top search result, and
+disambiguation pages and topics without a result raise WikiError.
+"""
+
+import http_client
+
+API_URL = "https://{code}.wikipedia.org/w/api.php"
+
+
+class WikiError(Exception):
+    pass
+
+
+def _query(code, timeout, **params):
+    response = http_client.get(API_URL.format(code=code), timeout=timeout,
+                               params=dict(params, action="query", format="json", formatversion=2))
+    response.raise_for_status()
+    data = response.json()
+    if "error" in data:
+        raise WikiError(data["error"].get("info", "Wikipedia API error"))
+    return data.get("query", {})
+
+
+def _top_page(query, topic):
+    pages = query.get("pages") or []
+    if not pages:
+        raise WikiError(f"No Wikipedia article for '{topic}'")
+    page = pages[0]
+    if "disambiguation" in page.get("pageprops", {}):
+        raise WikiError(f"'{topic}' is ambiguous")
+    return page
+
+
+def summary(topic, sentences=10, code="it", timeout=5):
+    """Plain text of the first sentences of the article (one request)."""
+    query = _query(code, timeout, generator="search", gsrsearch=topic, gsrlimit=1, redirects=1,
+                   prop="extracts|pageprops", ppprop="disambiguation", explaintext=1, exsentences=sentences)
+    return _top_page(query, topic).get("extract", "")
+
+
+def image_urls(topic, code="it", timeout=5):
+    """URLs of the images on the article, in the API's order (two requests)."""
+    query = _query(code, timeout, generator="search", gsrsearch=topic, gsrlimit=1, redirects=1,
+                   prop="pageprops", ppprop="disambiguation")
+    title = _top_page(query, topic)["title"]
+    query = _query(code, timeout, titles=title, generator="images", gimlimit="max",
+                   prop="imageinfo", iiprop="url")
+    return [info["url"] for page in query.get("pages") or [] for info in page.get("imageinfo", [])]